@@ -20,6 +20,9 @@ except ImportError:
     print("Anthropic (Claude) not available")
     Anthropic = None
 
+# Fenced code blocks (optional language tag) in AI responses
+_CODE_BLOCK_RE = re.compile(r'```(?:(\w+)\n)?(.*?)\n?```', re.DOTALL)
+
 class AIMorpheus:
     def __init__(self, parent_window):
         self.parent = parent_window
@@ -28,8 +31,8 @@ class AIMorpheus:
         self.provider = "openai"  # Default provider
         self.current_model = "gpt-4o-mini"  # Default model
         
-        # Load provider preference
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
+        # Load provider preference (one QSettings instance, reused by _make_client)
+        self._settings = settings = QtCore.QSettings("AI_Script_Editor", "settings")
         self.provider = settings.value("AI_PROVIDER", "openai")
         
         # Load model preference
@@ -43,7 +46,7 @@ class AIMorpheus:
 
     def _make_client(self):
         """Create AI client based on selected provider."""
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
+        settings = self._settings
         
         if self.provider == "claude":
             if not Anthropic:
@@ -358,7 +361,7 @@ class AIMorpheus:
             return
 
         # Find code blocks with reliable regex approach
-        code_blocks = re.findall(r'```(?:(\w+)\n)?(.*?)\n?```', content, flags=re.DOTALL)
+        code_blocks = _CODE_BLOCK_RE.findall(content)
         
         if code_blocks:
             # Use a simple approach: replace code blocks with placeholders, then restore them
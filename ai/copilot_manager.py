@@ -2,7 +2,7 @@
 AI Morpheus Manager — Phase 4
 Manages global AI context, conversation memory, and inline completions for NEO Script Editor.
 """
-import os, json, time, threading
+import os, json, time, threading, queue
 from qt_compat import QtCore
 try:
     from openai import OpenAI
@@ -16,6 +16,7 @@ class MorpheusManager(QtCore.QObject):
     contextUpdated = QtCore.Signal(str)     # notify other panels
     historyUpdated = QtCore.Signal(list)    # notify chat history changes
     responseReady = QtCore.Signal(str)      # emitted when AI response is ready
+    responseChunk = QtCore.Signal(str)      # partial response text while streaming
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -26,6 +27,19 @@ class MorpheusManager(QtCore.QObject):
         self.last_prompt_time = 0
         self.chat_history = []              # Current session chat history
         self.current_chat_index = -1        # For navigation through history
+        
+        # Background worker for AI requests (see _submit)
+        self._jobs = queue.Queue()
+        self._worker = None
+        
+        # Debounced memory writes (see schedule_save_memory)
+        self._save_timer = QtCore.QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(2000)
+        self._save_timer.timeout.connect(self._save_memory)
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush_memory)
 
     # -----------------------------------------------------
     def _load_memory(self):
@@ -48,6 +62,16 @@ class MorpheusManager(QtCore.QObject):
         except Exception:
             pass
 
+    def schedule_save_memory(self):
+        """Write memory to disk shortly, coalescing bursts of edits into one write."""
+        self._save_timer.start()
+
+    def flush_memory(self):
+        """Write any pending memory changes now."""
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self._save_memory()
+
     # -----------------------------------------------------
     def record_conversation(self, user_msg, ai_reply):
         """Record conversation in both persistent memory and session history."""
@@ -200,22 +224,40 @@ Remember: You're not just fixing code - you're helping users see beyond the matr
                 else:
                     messages.append({"role": "user", "content": message})
                 
-                # Make API call
-                response = client.chat.completions.create(
+                # Make API call, streaming the reply so it can be shown as it arrives
+                stream = client.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=messages,
                     max_tokens=1000,
-                    temperature=0.7
+                    temperature=0.7,
+                    stream=True
                 )
                 
-                ai_response = response.choices[0].message.content
+                # Forward text in batches (at most every 50ms) rather than one
+                # queued GUI call per token
+                parts = []
+                pending = []
+                last_emit = time.monotonic()
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    parts.append(text)
+                    pending.append(text)
+                    now = time.monotonic()
+                    if now - last_emit >= 0.05:
+                        QtCore.QMetaObject.invokeMethod(self, "_emit_chunk", QtCore.Qt.QueuedConnection,
+                                                       QtCore.Q_ARG(str, "".join(pending)))
+                        pending = []
+                        last_emit = now
                 
-                # Record conversation and emit response (ensure it runs in main thread)
-                self.record_conversation(message, ai_response)
+                ai_response = "".join(parts)
                 
-                # Use QMetaObject.invokeMethod to ensure signal emission in main thread
-                QtCore.QMetaObject.invokeMethod(self, "_emit_response", QtCore.Qt.QueuedConnection, 
-                                               QtCore.Q_ARG(str, ai_response))
+                # Record conversation and emit response in the main thread
+                QtCore.QMetaObject.invokeMethod(self, "_record_and_emit", QtCore.Qt.QueuedConnection,
+                                               QtCore.Q_ARG(str, message), QtCore.Q_ARG(str, ai_response))
                 
             except Exception as e:
                 error_msg = f"OpenAI API error: {str(e)}"
@@ -223,19 +265,54 @@ Remember: You're not just fixing code - you're helping users see beyond the matr
                 
                 # Fallback to mock response on API error
                 fallback_response = self._generate_mock_response(message, context)
-                self.record_conversation(message, fallback_response)
-                QtCore.QTimer.singleShot(0, lambda: self.responseReady.emit(fallback_response))
+                QtCore.QMetaObject.invokeMethod(self, "_record_and_emit", QtCore.Qt.QueuedConnection,
+                                               QtCore.Q_ARG(str, message), QtCore.Q_ARG(str, fallback_response))
         
-        # Run API call in separate thread to avoid blocking UI
-        thread = threading.Thread(target=make_api_call)
-        thread.daemon = True
-        thread.start()
+        # Run API call on the background worker to avoid blocking UI
+        self._submit(make_api_call)
+
+    def _submit(self, job):
+        """Run job on the manager's background worker thread (started on first use)."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run_jobs, name="MorpheusWorker")
+            self._worker.daemon = True
+            self._worker.start()
+        self._jobs.put(job)
+
+    def _run_jobs(self):
+        """Worker loop: run queued jobs one at a time."""
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"[MorpheusManager] Background job failed: {e}")
+
+    @QtCore.Slot(str)
+    def _emit_chunk(self, text):
+        """Emit streamed response text in main thread."""
+        self.responseChunk.emit(text)
 
     @QtCore.Slot(str)
     def _emit_response(self, response):
         """Emit response signal in main thread."""
         self.responseReady.emit(response)
 
+    def send_offline_message(self, message, context=""):
+        """Generate a built-in (offline) response in a separate thread."""
+        def generate():
+            response = self._generate_mock_response(message, context)
+            QtCore.QMetaObject.invokeMethod(self, "_record_and_emit", QtCore.Qt.QueuedConnection,
+                                           QtCore.Q_ARG(str, message), QtCore.Q_ARG(str, response))
+
+        self._submit(generate)
+
+    @QtCore.Slot(str, str)
+    def _record_and_emit(self, message, response):
+        """Record conversation and emit response signal in main thread."""
+        self.record_conversation(message, response)
+        self.responseReady.emit(response)
+
     def _generate_mock_response(self, message, context=""):
         """Generate a mock AI response when OpenAI is not available."""
         message_lower = message.lower()
@@ -175,6 +175,8 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         # Error tracking
         self.syntax_errors = []
         self.error_highlights = []
+        self._syntax_errors_version = 0  # Bumped whenever syntax_errors is republished
+        self._syntax_errors_cache = None  # ((revision, version), errors tuple)
         
         # Code folding state
         self.folded_blocks = set()  # Set of line numbers that are folded
@@ -453,6 +455,7 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         # Clear previous errors
         self._clear_error_highlights()
         self.syntax_errors.clear()
+        self._syntax_errors_version += 1
         
         # Clear red background from previous errors
         if self.highlighter and hasattr(self.highlighter, 'clear_copilot_error_lines'):
@@ -572,6 +575,7 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
             # Pass 3: Check Maya-specific API errors (cmds, PyMEL, OpenMaya)
             maya_errors = self._check_maya_api_errors(code, error_lines)
             self.syntax_errors.extend(maya_errors[:5])  # Add up to 5 Maya errors
+            self._syntax_errors_version += 1
             
             # Get all lines for validation
             all_lines = code.split('\n')
@@ -1046,11 +1050,19 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
     def get_syntax_errors(self):
         """Get current syntax errors."""
         return self.syntax_errors.copy()
+    
+    def cached_syntax_errors(self):
+        """Get current syntax errors as a tuple, reused until the document or the errors change."""
+        key = (self.document().revision(), self._syntax_errors_version)
+        if self._syntax_errors_cache is None or self._syntax_errors_cache[0] != key:
+            self._syntax_errors_cache = (key, tuple(self.syntax_errors))
+        return self._syntax_errors_cache[1]
         
     def clear_syntax_errors(self):
         """Clear syntax error highlights including red background."""
         self._clear_error_highlights()
         self.syntax_errors.clear()
+        self._syntax_errors_version += 1
         
         # Clear red background highlighting
         if self.highlighter and hasattr(self.highlighter, 'clear_copilot_error_lines'):
@@ -2156,7 +2168,8 @@ If the error is "expected ':'" on "if x == 5", reply with: if x == 5:"""
             self._original_error_line = original_line
             self._error_line_number = line_number
             
-            # Get Morpheus
+            # Get Morpheus (created on first use)
+            main_window.chat_manager._ensure_morpheus()
             morpheus = main_window.chat_manager.morpheus
             if not morpheus or not morpheus.client:
                 return
@@ -727,6 +727,10 @@ class AiScriptEditor(QtWidgets.QMainWindow):
         print("[Session] closeEvent triggered - cleaning up resources")
         self._save_session()
         
+        # Write any debounced Morpheus memory changes
+        if getattr(self, 'morpheus_manager', None):
+            self.morpheus_manager.flush_memory()
+        
         # Remove Maya exit callback if it exists
         if hasattr(self, '_maya_exit_callback_id') and self._maya_exit_callback_id:
             try:
@@ -2,13 +2,405 @@
 Chat Manager
 Handles Morpheus AI chat interface, provider/model selection, and all AI interactions
 """
+import collections
 import html
+import itertools
+import logging
 import os
 import re
-import uuid
+import threading
+import time
 import difflib
-import traceback
+import functools
 from qt_compat import QtWidgets, QtCore, QtGui
+from .dialog_styles import apply_dark_theme
+
+logger = logging.getLogger(__name__)
+
+# Chat message HTML, filled in with str.format_map
+_MORPHEUS_MESSAGE_HTML = (
+    '<div class="morpheus-response" style="margin-bottom: 16px; padding: 8px; '
+    'border-left: 3px solid {color}; background: rgba(255,255,255,0.03);">'
+    '<div style="color: {color}; font-weight: 600; margin-bottom: 4px;">'
+    '{sender} <span style="color: #8b949e; font-size: 11px; font-weight: normal;">{timestamp}</span>'
+    '</div>'
+    '<div style="font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif; '
+    'color: #00ff41; line-height: 1.4;">{body}</div>'
+    '</div><br>'
+)
+_USER_MESSAGE_HEADER_HTML = (
+    '<div style="color: {color}; font-weight: 600; margin-bottom: 4px;">'
+    '{sender} <span style="color: #8b949e; font-size: 11px; font-weight: normal;">{timestamp}</span> '
+    '<a href="edit:{msg_id}" style="color: #58a6ff; text-decoration: none; font-size: 11px; margin-left: 8px;">✎ edit</a>'
+    '</div>'
+)
+
+# Text frames for the "pondering" indicator animation
+_THINKING_FRAMES = tuple(f"Morpheus is pondering{'.' * dots}" for dots in range(4))
+
+# Icons and other bundled images
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+_MORPHEUS_ICON_PATH = os.path.join(_ASSETS_DIR, "morpheus.png")
+_NEW_CHAT_ICON_PATH = os.path.join(_ASSETS_DIR, "replace.png")
+
+# Fenced code blocks in Morpheus responses
+_CODE_BLOCK_RE = re.compile(r'```(?:python|py)?\s*(.*?)```', re.DOTALL)
+
+# Shared style for the provider and model selectors
+COMBOBOX_STYLE = """
+    QComboBox {
+        background: #21262d;
+        border: 1px solid #30363d;
+        border-radius: 4px;
+        padding: 4px 8px;
+        color: #f0f6fc;
+        font-size: 11px;
+    }
+    QComboBox:hover { border-color: #00ff41; }
+    QComboBox::drop-down { border: none; }
+    QComboBox::down-arrow {
+        image: none;
+        border-left: 4px solid transparent;
+        border-right: 4px solid transparent;
+        border-top: 5px solid #8b949e;
+    }
+    QComboBox QAbstractItemView {
+        background: #21262d;
+        border: 1px solid #30363d;
+        selection-background-color: transparent;
+        color: #f0f6fc;
+        outline: none;
+    }
+    QComboBox QAbstractItemView::item {
+        padding: 4px 8px;
+        min-height: 20px;
+        border-left: 3px solid transparent;
+    }
+    QComboBox QAbstractItemView::item:selected {
+        border-left: 3px solid #00ff41;
+        background: transparent;
+    }
+"""
+
+# Morpheus dock widgets, keyed by object name; set once on the dock so the
+# style engine parses a single sheet for all of them
+MORPHEUS_DOCK_STYLE = """
+    QPushButton#morpheusFloatBtn {
+        background: transparent;
+        border: none;
+        color: #8b949e;
+        font-size: 16px;
+        border-radius: 4px;
+    }
+    QPushButton#morpheusFloatBtn:hover { background: #30363d; color: #f0f6fc; }
+    QPushButton#morpheusCloseBtn {
+        background: transparent;
+        border: none;
+        color: #8b949e;
+        font-size: 14px;
+        border-radius: 4px;
+    }
+    QPushButton#morpheusCloseBtn:hover { background: #da3633; color: white; }
+    QPushButton#offlineToggle {
+        background: #238636;
+        border: 1px solid #2ea043;
+        color: white;
+        padding: 4px 8px;
+        border-radius: 4px;
+        font-size: 11px;
+        font-weight: 500;
+    }
+    QPushButton#offlineToggle:hover {
+        background: #2ea043;
+    }
+    QPushButton#offlineToggle:checked {
+        background: #da3633;
+        border: 1px solid #f85149;
+    }
+    QPushButton#offlineToggle:checked:hover {
+        background: #f85149;
+    }
+    QTextBrowser#chatHistory {
+        background: #0d1117;
+        border: 1px solid #30363d;
+        border-radius: 6px;
+        padding: 8px;
+        font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
+        font-size: 13px;
+        line-height: 1.5;
+        color: #f0f6fc;
+    }
+    QLabel#responseIndicator {
+        color: #00ff41;
+        font-family: "Segoe UI", Consolas, monospace;
+        font-size: 12px;
+        padding: 4px 8px;
+        background: rgba(0, 255, 65, 0.1);
+        border: 1px solid rgba(0, 255, 65, 0.2);
+        border-radius: 4px;
+    }
+    QPushButton#keepBtn {
+        background: #238636;
+        border: 1px solid #2ea043;
+        color: white;
+        padding: 4px 12px;
+        border-radius: 4px;
+        font-weight: 500;
+        font-size: 11px;
+    }
+    QPushButton#keepBtn:hover { background: #2ea043; }
+    QPushButton#copyBtn {
+        background: #00cc33;
+        border: 1px solid #00ff41;
+        color: #000000;
+        padding: 4px 12px;
+        border-radius: 4px;
+        font-weight: 500;
+        font-size: 11px;
+    }
+    QPushButton#copyBtn:hover { background: #00ff41; }
+    QPushButton#undoBtn {
+        background: #da3633;
+        border: 1px solid #f85149;
+        color: white;
+        padding: 4px 12px;
+        border-radius: 4px;
+        font-weight: 500;
+        font-size: 11px;
+    }
+    QPushButton#undoBtn:hover { background: #f85149; }
+    QTextEdit#chatInput {
+        background: #21262d;
+        border: 1px solid #30363d;
+        border-radius: 6px;
+        padding: 8px;
+        color: #f0f6fc;
+        font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
+        font-size: 13px;
+    }
+    QTextEdit#chatInput:focus { border-color: #00ff41; }
+    QPushButton#sendBtn {
+        background: transparent;
+        border: 1px solid #30363d;
+        color: #00ff41;
+        border-radius: 6px;
+        font-size: 18px;
+    }
+    QPushButton#sendBtn:hover {
+        background: #30363d;
+        border-color: #00ff41;
+    }
+    QPushButton#sendBtn:disabled {
+        color: #484848;
+        border-color: #30363d;
+    }
+""" + COMBOBOX_STYLE
+
+# Edit message dialog (applied once on the dialog, on top of the dark theme)
+EDIT_MESSAGE_DIALOG_STYLE = """
+    QPlainTextEdit#editMessageInput {
+        background: #0d1117;
+        border: 1px solid #30363d;
+        border-radius: 6px;
+        padding: 8px;
+        color: #c9d1d9;
+        font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
+        font-size: 13px;
+        line-height: 1.5;
+    }
+    QPlainTextEdit#editMessageInput:focus {
+        border-color: #58a6ff;
+    }
+    QPushButton#cancelBtn {
+        background: #21262d;
+        border: 1px solid #30363d;
+        color: #c9d1d9;
+        padding: 6px 16px;
+        border-radius: 6px;
+        font-size: 13px;
+    }
+    QPushButton#cancelBtn:hover {
+        background: #30363d;
+        border-color: #8b949e;
+    }
+    QPushButton#sendBtn {
+        background: #238636;
+        border: 1px solid #2ea043;
+        color: white;
+        padding: 6px 16px;
+        border-radius: 6px;
+        font-size: 13px;
+        font-weight: 500;
+    }
+    QPushButton#sendBtn:hover {
+        background: #2ea043;
+    }
+"""
+
+# (display name, provider id) choices for the dock's provider selector
+PROVIDERS = (
+    ("GPT-4o (OpenAI)", "openai"),
+    ("Claude Sonnet (Anthropic)", "claude"),
+)
+_PROVIDER_INDEX = {provider: i for i, (_, provider) in enumerate(PROVIDERS)}
+
+# (display name, model id) choices per provider
+OPENAI_MODELS = (
+    ("GPT-4o Mini (Fast, Cheap)", "gpt-4o-mini"),
+    ("GPT-4o (Most Capable)", "gpt-4o"),
+    ("GPT-4 Turbo", "gpt-4-turbo"),
+    ("o1-preview (Reasoning)", "o1-preview"),
+    ("o1-mini (Fast Reasoning)", "o1-mini"),
+)
+CLAUDE_MODELS = (
+    ("Claude Sonnet 4 (Latest)", "claude-sonnet-4-20250514"),
+    ("Claude Opus 4 (Most Capable)", "claude-opus-4-20250514"),
+    ("Claude Sonnet 3.5 (Legacy)", "claude-3-5-sonnet-20241022"),
+    ("Claude Haiku 3.5 (Fast)", "claude-3-5-haiku-20241022"),
+)
+_OPENAI_MODEL_IDS = tuple(model_id for _, model_id in OPENAI_MODELS)
+_CLAUDE_MODEL_IDS = tuple(model_id for _, model_id in CLAUDE_MODELS)
+# model id -> row in the model selector
+_OPENAI_MODEL_INDEX = {model_id: i for i, model_id in enumerate(_OPENAI_MODEL_IDS)}
+_CLAUDE_MODEL_INDEX = {model_id: i for i, model_id in enumerate(_CLAUDE_MODEL_IDS)}
+_OPENAI_MODEL_NAMES = [display_name for display_name, _ in OPENAI_MODELS]
+_CLAUDE_MODEL_NAMES = [display_name for display_name, _ in CLAUDE_MODELS]
+
+# Conversations rendered per batch when showing the whole history; older ones
+# are rendered as the chat is scrolled to the top
+CONVERSATION_RENDER_BATCH = 50
+
+# Upper bound on user messages tracked for editing
+MAX_TRACKED_USER_MESSAGES = 4096
+
+# Upper bound on code blocks kept for "Copy code" links (oldest are dropped)
+MAX_CODE_BLOCKS = 256
+
+# Editor code auto-included in prompts is cropped beyond these limits
+MAX_CONTEXT_CHARS = 8192
+MAX_CONTEXT_LINES = 400
+CONTEXT_CURSOR_WINDOW = 100  # lines kept on each side of the cursor
+CONTEXT_ERROR_WINDOW = 5     # lines kept on each side of a syntax error
+
+# Lines longer than this are compared as code tokens instead of characters
+LONG_LINE_CHARS = 120
+
+# html.escape() plus newline-to-<br> conversion in a single pass
+_HTML_ESCAPE_BR = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;', '\n': '<br>',
+})
+
+# Words/identifiers or single punctuation characters
+_TOKEN_RE = re.compile(r"\w+|\S")
+
+
+# Document resource the Morpheus sender icon is registered under
+_MORPHEUS_ICON_URL = "morpheus://icon"
+_MORPHEUS_ICON_HTML = f'<img src="{_MORPHEUS_ICON_URL}" width="16" height="16" style="vertical-align: middle; margin-right: 4px;">'
+
+
+@functools.lru_cache(maxsize=None)
+def _morpheus_icon_pixmap():
+    """Morpheus sender icon, read from disk on first use only (None if missing)"""
+    if not os.path.exists(_MORPHEUS_ICON_PATH):
+        return None
+    pixmap = QtGui.QPixmap(_MORPHEUS_ICON_PATH)
+    return None if pixmap.isNull() else pixmap
+
+
+def _common_prefix_len(a, b):
+    """Number of leading items shared by sequences a and b"""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _may_reach(a, b, threshold):
+    """False when a and b are too different in length to reach threshold
+    
+    Character ratio() is at most 2*min(len)/(len(a)+len(b)). Long lines are
+    compared as tokens, which their character lengths do not bound.
+    """
+    la, lb = len(a), len(b)
+    if la > LONG_LINE_CHARS or lb > LONG_LINE_CHARS:
+        return True
+    return 2.0 * min(la, lb) / (la + lb) >= threshold
+
+
+@functools.lru_cache(maxsize=1024)
+def _tokenize(line):
+    """Split a line of code into a tuple of tokens"""
+    return tuple(_TOKEN_RE.findall(line))
+
+
+@functools.lru_cache(maxsize=256)
+def _split_morpheus_message(message):
+    """Split a response into ((prose HTML, raw code), ...) and the tail HTML
+    
+    Prose is escaped with newlines turned into <br>. Cached, since reloading
+    a conversation re-renders the same responses.
+    """
+    segments = []
+    pos = 0
+    for match in _CODE_BLOCK_RE.finditer(message):
+        segments.append((message[pos:match.start()].translate(_HTML_ESCAPE_BR), match.group(1).strip()))
+        pos = match.end()
+    return tuple(segments), message[pos:].translate(_HTML_ESCAPE_BR)
+
+
+class _LineMatcher:
+    """Similarity of many candidate lines against one target line
+    
+    The target's matcher index is built once. Long lines are compared as
+    token sequences, since character-level ratio() is quadratic in length.
+    """
+    
+    def __init__(self, target):
+        self.target = target
+        self._chars = difflib.SequenceMatcher(None, autojunk=False)
+        self._chars.set_seq2(target)
+        self._tokens = None
+    
+    def ratio(self, line, threshold=0.0):
+        """Similarity of line to the target
+        
+        When threshold is given, lines whose cheap upper bounds already fall
+        below it return that bound instead of the full ratio().
+        """
+        if len(line) > LONG_LINE_CHARS or len(self.target) > LONG_LINE_CHARS:
+            if self._tokens is None:
+                self._tokens = difflib.SequenceMatcher(None, autojunk=False)
+                self._tokens.set_seq2(_tokenize(self.target))
+            matcher = self._tokens
+            matcher.set_seq1(_tokenize(line))
+        else:
+            matcher = self._chars
+            matcher.set_seq1(line)
+        if threshold:
+            bound = matcher.real_quick_ratio()
+            if bound < threshold:
+                return bound
+            bound = matcher.quick_ratio()
+            if bound < threshold:
+                return bound
+        return matcher.ratio()
+
+
+class _InlineMatchSignals(QtCore.QObject):
+    """Delivers background inline-diff matches back to the GUI thread"""
+    matchReady = QtCore.Signal(int, object, str)  # generation, replacement_info, code
+
+
+class CodeBlock:
+    """A code block extracted from a Morpheus response"""
+    __slots__ = ('raw', 'lines', 'targeted')
+    
+    def __init__(self, raw, lines, targeted):
+        self.raw = raw
+        self.lines = lines
+        self.targeted = targeted
 
 
 class ChatManager:
@@ -44,32 +436,97 @@ class ChatManager:
         self.thinkingTimer.timeout.connect(self.animate_thinking)
         self.thinkingDots = 0
         
-        # AI instances
+        # AI instances (the provider client is created on first use)
         self.morpheus = None
         self.morpheus_manager = None
+        self._morpheus_failed = False  # set once if AIMorpheus can't be created
         
         # Offline mode toggle
         self.offline_mode = False
         self.offlineToggle = None
         
-        # Code blocks storage
+        # Code blocks storage (block_id -> CodeBlock), ordered oldest -> newest;
+        # cleared whenever the chat is cleared or reloaded
         self._code_blocks = {}
-        self._code_block_html = {}
+        self._code_block_ids = {}  # raw code -> block_id, so repeated code is stored once
+        self._code_block_counter = itertools.count(1)  # ids only need to be unique per session
         
         # User messages storage for editing (msg_id -> conversation index in morpheus_manager.chat_history)
-        self._user_messages = {}
-        
-        # Model selector connection tracking
-        self._model_selector_connected = False
+        # Ordered oldest -> newest and keyed by a monotonic counter
+        self._user_messages = collections.OrderedDict()
+        self._user_message_ids = itertools.count(1)
+        
+        # Provider whose models the model combo currently lists
+        self._model_list_provider = None
+        
+        # One settings object for the lifetime of the manager
+        self._settings = QtCore.QSettings("AI_Script_Editor", "settings")
+        # (dialog, provider combo, OpenAI key input, Claude key input), built on
+        # first show_settings_dialog()
+        self._settings_dialog = None
+        # In-memory copy of AI_PROVIDER; updated wherever it is written
+        self._current_provider = self._settings.value("AI_PROVIDER", "openai")
+        # (provider, hash of API key) the Morpheus client was last built with
+        self._client_key = None
+        
+        # Text formats for user message bubbles (built once, reused per message),
+        # matching the Morpheus bubble markup: faint background, inset text and
+        # a light body colour with 1.4 line height
+        self._user_bubble_block_format = QtGui.QTextBlockFormat()
+        self._user_bubble_block_format.setBackground(QtGui.QColor(255, 255, 255, 8))
+        self._user_bubble_block_format.setLeftMargin(8)
+        self._user_bubble_block_format.setRightMargin(8)
+        self._user_body_char_format = QtGui.QTextCharFormat()
+        self._user_body_char_format.setForeground(QtGui.QColor("#f0f6fc"))
+        self._user_body_block_format = QtGui.QTextBlockFormat(self._user_bubble_block_format)
+        self._user_body_block_format.setLineHeight(140, QtGui.QTextBlockFormat.ProportionalHeight)
+        self._message_end_block_format = QtGui.QTextBlockFormat()
+        self._message_end_block_format.setTopMargin(16)
+        
+        # Cached "hh:mm" string for the current minute
+        self._timestamp_minute = None
+        self._timestamp_text = ""
+        
+        # Deferred scroll-to-bottom (coalesces bursts of inserted messages)
+        self._scroll_pending = False
+        
+        # Last (label text, prev enabled, next enabled) shown by update_history_info
+        self._history_state = None
+        
+        # First chat_history index currently rendered, and reload guard
+        self._rendered_from = 0
+        self._reloading_chat = False
+        self._prepending_history = False  # rendering an older batch above the chat
+        
+        # Streaming message state (cursor marking where the bubble starts; it
+        # tracks the position if older messages are inserted above it)
+        self._stream_start = None
+        self._stream_sender = None
+        self._stream_color = None
+        self._stream_cursor = None  # insertion point for the live Morpheus reply
+        
+        # Inline diff matching runs off the GUI thread; only the result of the
+        # latest request (highest generation) is shown
+        self._match_generation = 0
+        self._match_editor = None
+        self._match_revision = None
+        self._match_signals = _InlineMatchSignals()
+        self._match_signals.matchReady.connect(self._on_inline_match_ready, QtCore.Qt.QueuedConnection)
         
     def build_chat_dock(self):
-        """Build Morpheus AI chat dock"""
-        # Check for custom icon
-        icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "morpheus.png")
+        """Build Morpheus AI chat dock
+        
+        The dock is only hidden when closed, so it is built once; later calls
+        return the existing dock instead of constructing a second widget tree.
+        """
+        existing = self.parent.dock_manager.chat_dock
+        if existing is not None:
+            return existing
         
         # Create dock
         chatDock = QtWidgets.QDockWidget(self.parent)
         chatDock.setObjectName("MorpheusDock")
+        chatDock.setStyleSheet(MORPHEUS_DOCK_STYLE)
         chatDock.setAllowedAreas(QtCore.Qt.AllDockWidgetAreas)
         chatDock.setFeatures(
             QtWidgets.QDockWidget.DockWidgetMovable | 
@@ -94,32 +551,14 @@ class ChatManager:
         floatBtn = QtWidgets.QPushButton("⇄")
         floatBtn.setFixedSize(24, 24)
         floatBtn.setToolTip("Float/Dock")
-        floatBtn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                color: #8b949e;
-                font-size: 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover { background: #30363d; color: #f0f6fc; }
-        """)
+        floatBtn.setObjectName("morpheusFloatBtn")
         floatBtn.clicked.connect(lambda: chatDock.setFloating(not chatDock.isFloating()))
         
         # Add close button
         closeBtn = QtWidgets.QPushButton("✕")
         closeBtn.setFixedSize(24, 24)
         closeBtn.setToolTip("Close")
-        closeBtn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                color: #8b949e;
-                font-size: 14px;
-                border-radius: 4px;
-            }
-            QPushButton:hover { background: #da3633; color: white; }
-        """)
+        closeBtn.setObjectName("morpheusCloseBtn")
         closeBtn.clicked.connect(chatDock.close)
         
         titleLayout.addWidget(floatBtn)
@@ -149,14 +588,14 @@ class ChatManager:
         self.nextChatBtn.clicked.connect(self.next_conversation)
         
         self.historyLabel = QtWidgets.QLabel("1/1")
+        self._history_state = None  # new widgets, so the next update must apply
         self.historyLabel.setAlignment(QtCore.Qt.AlignCenter)
         self.historyLabel.setStyleSheet("color: #8b949e; font-size: 11px;")
         
         # New chat button with icon from assets
         self.newChatBtn = QtWidgets.QPushButton(" New")
-        new_icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "replace.png")
-        if os.path.exists(new_icon_path):
-            self.newChatBtn.setIcon(QtGui.QIcon(new_icon_path))
+        if os.path.exists(_NEW_CHAT_ICON_PATH):
+            self.newChatBtn.setIcon(QtGui.QIcon(_NEW_CHAT_ICON_PATH))
             self.newChatBtn.setIconSize(QtCore.QSize(14, 14))
         else:
             self.newChatBtn.setText("✨ New")  # Fallback to emoji if icon not found
@@ -168,27 +607,7 @@ class ChatManager:
         self.offlineToggle.setCheckable(True)
         self.offlineToggle.setChecked(False)  # Default to online mode
         self.offlineToggle.setToolTip("Toggle between online and offline mode")
-        self.offlineToggle.setStyleSheet("""
-            QPushButton {
-                background: #238636;
-                border: 1px solid #2ea043;
-                color: white;
-                padding: 4px 8px;
-                border-radius: 4px;
-                font-size: 11px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background: #2ea043;
-            }
-            QPushButton:checked {
-                background: #da3633;
-                border: 1px solid #f85149;
-            }
-            QPushButton:checked:hover {
-                background: #f85149;
-            }
-        """)
+        self.offlineToggle.setObjectName("offlineToggle")
         self.offlineToggle.clicked.connect(self.toggle_offline_mode)
         
         historyLayout.addWidget(self.prevChatBtn)
@@ -205,34 +624,14 @@ class ChatManager:
         self.chatHistory.setOpenExternalLinks(False)
         self.chatHistory.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
         self.chatHistory.anchorClicked.connect(self.handle_code_action)
-        self.chatHistory.setStyleSheet("""
-            QTextBrowser {
-                background: #0d1117;
-                border: 1px solid #30363d;
-                border-radius: 6px;
-                padding: 8px;
-                font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
-                font-size: 13px;
-                line-height: 1.5;
-                color: #f0f6fc;
-            }
-        """)
+        self.chatHistory.verticalScrollBar().valueChanged.connect(self._on_chat_scrolled)
+        self.chatHistory.setObjectName("chatHistory")
         chatLayout.addWidget(self.chatHistory, 1)
 
         # Response indicator
         self.responseIndicator = QtWidgets.QLabel()
         self.responseIndicator.setText("Morpheus is pondering...")
-        self.responseIndicator.setStyleSheet("""
-            QLabel {
-                color: #00ff41;
-                font-family: "Segoe UI", Consolas, monospace;
-                font-size: 12px;
-                padding: 4px 8px;
-                background: rgba(0, 255, 65, 0.1);
-                border: 1px solid rgba(0, 255, 65, 0.2);
-                border-radius: 4px;
-            }
-        """)
+        self.responseIndicator.setObjectName("responseIndicator")
         self.responseIndicator.setVisible(False)
         chatLayout.addWidget(self.responseIndicator)
 
@@ -244,48 +643,15 @@ class ChatManager:
         
         self.keepBtn = QtWidgets.QPushButton("Keep")
         self.keepBtn.setToolTip("Apply this code to your editor")
-        self.keepBtn.setStyleSheet("""
-            QPushButton {
-                background: #238636;
-                border: 1px solid #2ea043;
-                color: white;
-                padding: 4px 12px;
-                border-radius: 4px;
-                font-weight: 500;
-                font-size: 11px;
-            }
-            QPushButton:hover { background: #2ea043; }
-        """)
+        self.keepBtn.setObjectName("keepBtn")
         
         self.copyBtn = QtWidgets.QPushButton("Copy")
         self.copyBtn.setToolTip("Copy code to clipboard")
-        self.copyBtn.setStyleSheet("""
-            QPushButton {
-                background: #00cc33;
-                border: 1px solid #00ff41;
-                color: #000000;
-                padding: 4px 12px;
-                border-radius: 4px;
-                font-weight: 500;
-                font-size: 11px;
-            }
-            QPushButton:hover { background: #00ff41; }
-        """)
+        self.copyBtn.setObjectName("copyBtn")
         
         self.undoBtn = QtWidgets.QPushButton("Undo")
         self.undoBtn.setToolTip("Undo last code change")
-        self.undoBtn.setStyleSheet("""
-            QPushButton {
-                background: #da3633;
-                border: 1px solid #f85149;
-                color: white;
-                padding: 4px 12px;
-                border-radius: 4px;
-                font-weight: 500;
-                font-size: 11px;
-            }
-            QPushButton:hover { background: #f85149; }
-        """)
+        self.undoBtn.setObjectName("undoBtn")
         
         actionButtonsLayout.addWidget(self.keepBtn)
         actionButtonsLayout.addWidget(self.copyBtn)
@@ -309,58 +675,26 @@ class ChatManager:
         provider_label.setStyleSheet("color: #8b949e; font-size: 11px;")
         
         self.provider_selector = QtWidgets.QComboBox()
-        self.provider_selector.addItems(["GPT-4o (OpenAI)", "Claude Sonnet (Anthropic)"])
-        self.provider_selector.setStyleSheet("""
-            QComboBox {
-                background: #21262d;
-                border: 1px solid #30363d;
-                border-radius: 4px;
-                padding: 4px 8px;
-                color: #f0f6fc;
-                font-size: 11px;
-            }
-            QComboBox:hover { border-color: #00ff41; }
-            QComboBox::drop-down { border: none; }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 5px solid #8b949e;
-            }
-            QComboBox QAbstractItemView {
-                background: #21262d;
-                border: 1px solid #30363d;
-                selection-background-color: transparent;
-                color: #f0f6fc;
-                outline: none;
-            }
-            QComboBox QAbstractItemView::item {
-                padding: 4px 8px;
-                min-height: 20px;
-                border-left: 3px solid transparent;
-            }
-            QComboBox QAbstractItemView::item:selected {
-                border-left: 3px solid #00ff41;
-                background: transparent;
-            }
-        """)
+        for display_name, provider in PROVIDERS:
+            self.provider_selector.addItem(display_name, provider)
         
         model_label = QtWidgets.QLabel("Model:")
         model_label.setStyleSheet("color: #8b949e; font-size: 11px;")
         
         self.model_selector = QtWidgets.QComboBox()
-        self.model_selector.setStyleSheet(self.provider_selector.styleSheet())
+        self._model_list_provider = None
+        # Connected once; update_model_list blocks signals while it refills the combo
+        self.model_selector.currentIndexChanged.connect(self.on_model_changed)
         
         # Load saved provider preference
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
-        current_provider = settings.value("AI_PROVIDER", "openai")
-        self.provider_selector.setCurrentText("Claude Sonnet (Anthropic)" if current_provider == "claude" else "GPT-4o (OpenAI)")
+        current_provider = self._current_provider
+        self.provider_selector.setCurrentIndex(_PROVIDER_INDEX.get(current_provider, 0))
         
         # Connect provider change
-        self.provider_selector.currentTextChanged.connect(self.on_provider_changed)
+        self.provider_selector.currentIndexChanged.connect(self.on_provider_changed)
         
         # Initialize model list
-        self.update_model_list()
+        self.update_model_list(current_provider)
         
         provider_layout.addWidget(provider_label)
         provider_layout.addWidget(self.provider_selector, 1)
@@ -373,18 +707,7 @@ class ChatManager:
         self.chatInput = QtWidgets.QTextEdit()
         self.chatInput.setMaximumHeight(60)
         self.chatInput.setPlaceholderText("Ask Morpheus anything about your code...")
-        self.chatInput.setStyleSheet("""
-            QTextEdit {
-                background: #21262d;
-                border: 1px solid #30363d;
-                border-radius: 6px;
-                padding: 8px;
-                color: #f0f6fc;
-                font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
-                font-size: 13px;
-            }
-            QTextEdit:focus { border-color: #00ff41; }
-        """)
+        self.chatInput.setObjectName("chatInput")
         
         # Override key press for Enter to send
         self.chatInput.keyPressEvent = self.chat_key_press_event
@@ -394,23 +717,7 @@ class ChatManager:
         self.sendBtn.setFixedSize(40, 60)
         self.sendBtn.setToolTip("Send message (Enter)")
         self.sendBtn.setCursor(QtCore.Qt.PointingHandCursor)
-        self.sendBtn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: 1px solid #30363d;
-                color: #00ff41;
-                border-radius: 6px;
-                font-size: 18px;
-            }
-            QPushButton:hover { 
-                background: #30363d;
-                border-color: #00ff41;
-            }
-            QPushButton:disabled {
-                color: #484848;
-                border-color: #30363d;
-            }
-        """)
+        self.sendBtn.setObjectName("sendBtn")
         self.sendBtn.clicked.connect(self.send_message)
 
         # Create horizontal layout for input and send button
@@ -423,7 +730,7 @@ class ChatManager:
         chatLayout.addWidget(inputWidget)
 
         chatDock.setWidget(chatWidget)
-        chatDock.visibilityChanged.connect(lambda visible: self.parent.dock_manager.sync_morpheus_action(visible))
+        chatDock.visibilityChanged.connect(self.parent.dock_manager.sync_morpheus_action)
         self.parent.addDockWidget(QtCore.Qt.RightDockWidgetArea, chatDock)
         
         # Store reference
@@ -435,50 +742,106 @@ class ChatManager:
         return chatDock
     
     def initialize_morpheus(self):
-        """Initialize Morpheus AI system"""
+        """Initialize Morpheus AI chat display
+        
+        The conversation manager (and its saved history) is created here; only
+        the AI provider client is created lazily on first use (see
+        _ensure_morpheus) so building the dock stays cheap.
+        """
+        # Morpheus icon for messages: a short <img> tag pointing at a document
+        # resource (see _add_chat_resources), not the image data itself
+        self.morpheus_icon_html = _MORPHEUS_ICON_HTML if _morpheus_icon_pixmap() else "🤖"
+        
+        # The chat document is still empty here, so set the greeting in one go
+        # rather than append() (which lays out an extra paragraph)
+        if self._has_api_key():
+            self.chatHistory.setHtml(f"""<div style="font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif; color: #00ff41;">{self.morpheus_icon_html} <b>Hello, I'm Morpheus.</b><br><br>
+            I'm your AI assistant for Maya scripting. Ask me about Python, MEL, or any coding challenges you're facing.<br><br></div>""")
+        else:
+            self.chatHistory.setHtml(f"[!] <b>Morpheus AI</b> - No API key found. Set your API key in Tools → Settings.<br><br>")
+        self._add_chat_resources()
+        
         try:
-            from ai.chat import AIMorpheus
             from ai.copilot_manager import MorpheusManager
             
-            self.morpheus = AIMorpheus(self.parent)
             self.morpheus_manager = MorpheusManager(self.parent)
-            
-            self.morpheus_manager.contextUpdated.connect(
-                lambda msg: (self.parent.dock_manager.console.append(f"[AI] Context updated: {msg[:50]}...") 
-                           if hasattr(self.parent.dock_manager, 'console') and self.parent.dock_manager.console else None)
-            )
+            self.morpheus_manager.contextUpdated.connect(self._on_context_updated)
             self.morpheus_manager.historyUpdated.connect(self.on_history_updated)
             self.morpheus_manager.responseReady.connect(self.on_morpheus_response)
+            self.morpheus_manager.responseChunk.connect(self.on_morpheus_chunk)
+        except Exception as e:
+            self._report_morpheus_failure(e)
+        self.parent.morpheus_manager = self.morpheus_manager
+        
+        # Load previous chat history if available
+        if self.morpheus_manager and self.morpheus_manager.chat_history:
+            self.load_current_conversation()
+        else:
+            self.update_history_info()
+    
+    def _report_morpheus_failure(self, error):
+        """Show a Morpheus initialization error (only the first one is shown)"""
+        if self._morpheus_failed:
+            return
+        self._morpheus_failed = True
+        print(f"Morpheus AI initialization failed: {error}")
+        self.chatHistory.append(f"[X] <b>Morpheus AI initialization failed:</b> {error}<br><br>")
+    
+    def _has_api_key(self):
+        """Check whether an API key is configured for the current provider"""
+        settings = self._settings
+        if self._current_provider == "claude":
+            key_name = "ANTHROPIC_API_KEY"
+        else:
+            key_name = "OPENAI_API_KEY"
+        return bool(settings.value(key_name, "") or os.environ.get(key_name, ""))
+    
+    def _make_client_key(self, provider):
+        """Identify the client configuration for provider (the key is only hashed)"""
+        key_name = "ANTHROPIC_API_KEY" if provider == "claude" else "OPENAI_API_KEY"
+        api_key = self._settings.value(key_name, "") or os.environ.get(key_name, "")
+        return provider, hash(api_key)
+    
+    def _ensure_morpheus(self):
+        """Create the AI provider client (AIMorpheus) on first use
+        
+        A failure is reported once and not retried on every send.
+        
+        Returns:
+            bool: True if Morpheus is available
+        """
+        if self.morpheus is not None:
+            return True
+        if self._morpheus_failed or self.morpheus_manager is None:
+            return False
+        
+        try:
+            from ai.chat import AIMorpheus
             
-            # Load Morpheus icon for messages
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "morpheus.png")
-            if os.path.exists(icon_path):
-                # Create small icon HTML for chat messages
-                # Convert Windows backslashes to forward slashes for HTML file URL
-                icon_url = icon_path.replace('\\', '/')
-                self.morpheus_icon_html = f'<img src="file:///{icon_url}" width="16" height="16" style="vertical-align: middle; margin-right: 4px;">'
-            else:
-                self.morpheus_icon_html = "🤖"
-            
-            if self.morpheus.client:
-                self.chatHistory.append(f"""<div style="font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif; color: #00ff41;">{self.morpheus_icon_html} <b>Hello, I'm Morpheus.</b><br><br>
-                I'm your AI assistant for Maya scripting. Ask me about Python, MEL, or any coding challenges you're facing.<br><br></div>""")
-                # Load previous chat history if available
-                if self.morpheus_manager and self.morpheus_manager.chat_history:
-                    self.load_current_conversation()
-            else:
-                self.chatHistory.append(f"[!] <b>Morpheus AI</b> - No API key found. Set your API key in Tools → Settings.<br><br>")
+            self.morpheus = AIMorpheus(self.parent)
+            self._client_key = self._make_client_key(self.morpheus.provider)
         except Exception as e:
-            print(f"Morpheus AI initialization failed: {e}")
-            self.chatHistory.append(f"[X] <b>Morpheus AI initialization failed:</b> {e}<br><br>")
             self.morpheus = None
-            self.morpheus_manager = None
+            self._report_morpheus_failure(e)
+        
+        # Keep main window references in sync (MorpheusManager reads parent.morpheus)
+        self.parent.morpheus = self.morpheus
+        return self.morpheus is not None
+    
+    def _on_context_updated(self, msg):
+        """Echo Morpheus context updates to the output console"""
+        console = getattr(self.parent.dock_manager, 'console', None)
+        if console:
+            console.append(f"[AI] Context updated: {msg[:50]}...")
     
     def send_message(self):
         """Send message to Morpheus AI"""
         message = self.chatInput.toPlainText().strip()
         if not message:
             return
+        
+        # Create the AI provider on first send
+        self._ensure_morpheus()
 
         # Add user message
         self.add_chat_message("You", message, "#00ff41")
@@ -518,7 +881,8 @@ class ChatManager:
         current_editor = self.parent.tabWidget.currentWidget()
         
         if current_editor and is_code_question and not is_conversation:
-            code = current_editor.toPlainText().strip()
+            text = current_editor.toPlainText()
+            code = text.strip()
             if code:  # Only include if there's actual code
                 # Get file info
                 tab_index = self.parent.tabWidget.indexOf(current_editor)
@@ -530,7 +894,7 @@ class ChatManager:
                 line_count = len(code.split('\n'))
                 
                 # 🎯 Get current syntax errors (like VS Code diagnostics)
-                errors = current_editor.get_syntax_errors() if hasattr(current_editor, 'get_syntax_errors') else []
+                errors = current_editor.cached_syntax_errors() if hasattr(current_editor, 'cached_syntax_errors') else []
                 error_context = ""
                 if errors:
                     error_context = "\n\n[SYNTAX ERRORS DETECTED]:\n"
@@ -539,6 +903,17 @@ class ChatManager:
                         msg = error.get('message', 'Unknown error')
                         error_context += f"  Line {line_num}: {msg}\n"
                 
+                # Crop large files around the cursor and the reported errors
+                # (the editor's line numbers index the unstripped text, so crop
+                # that and strip afterwards)
+                if len(code) > MAX_CONTEXT_CHARS or line_count > MAX_CONTEXT_LINES:
+                    code = self._truncate_code_context(
+                        text,
+                        current_editor.textCursor().blockNumber(),
+                        [error.get('line', 1) - 1 for error in errors[:5]],  # errors are 1-based
+                        "#" if lang == "python" else "//"
+                    ).strip()
+                
                 # Auto-include code context with EXPLICIT instructions for targeted responses
                 context = f"""[Current Editor Context - {tab_name} ({language.upper()}) - {line_count} lines]{error_context}
 
@@ -562,10 +937,9 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         if self.morpheus_manager:
             # If offline mode is enabled, force offline response
             if hasattr(self, 'offline_mode') and self.offline_mode:
-                # Force offline mode by using mock response directly
-                response = self.morpheus_manager._generate_mock_response(message, context if context else "")
-                self.morpheus_manager.record_conversation(message, response)
-                QtCore.QTimer.singleShot(500, lambda: self.on_morpheus_response(response))
+                # Force offline mode: built-in response generated off the UI thread,
+                # delivered through responseReady
+                self.morpheus_manager.send_offline_message(message, context if context else "")
             else:
                 # Send with context if available, otherwise just the message
                 self.morpheus_manager.send_message(context if context else message, code if context else "")
@@ -573,53 +947,74 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             self.add_chat_message("Morpheus", "AI service not available. Check your API key.", "#ff6b6b")
             self.sendBtn.setEnabled(True)
     
-    def add_chat_message(self, sender, message, color="#f0f6fc"):
-        """Add message to chat history"""
-        timestamp = QtCore.QTime.currentTime().toString("hh:mm")
+    def _truncate_code_context(self, code, cursor_line, error_lines, comment="#"):
+        """Keep only the lines around the cursor and the error lines (0-based)
+        
+        Dropped ranges are replaced with an elision comment so line structure
+        stays readable for the model.
+        """
+        lines = code.split('\n')
+        line_count = len(lines)
+        
+        keep = set(range(max(0, cursor_line - CONTEXT_CURSOR_WINDOW),
+                         min(line_count, cursor_line + CONTEXT_CURSOR_WINDOW + 1)))
+        for error_line in error_lines:
+            keep.update(range(max(0, error_line - CONTEXT_ERROR_WINDOW),
+                              min(line_count, error_line + CONTEXT_ERROR_WINDOW + 1)))
+        
+        result = []
+        skipped = 0
+        for i, line in enumerate(lines):
+            if i in keep:
+                if skipped:
+                    result.append(f"{comment} ... (truncated {skipped} lines) ...")
+                    skipped = 0
+                result.append(line)
+            else:
+                skipped += 1
+        if skipped:
+            result.append(f"{comment} ... (truncated {skipped} lines) ...")
+        
+        return '\n'.join(result)
+    
+    def add_chat_message(self, sender, message, color="#f0f6fc", sent_at=None, cursor=None):
+        """Add message to chat history
+        
+        Args:
+            sent_at: Optional epoch time the message was sent (defaults to now)
+            cursor: Optional cursor at the end of the chat document, so bulk
+                loads can insert many messages inside one edit block (the
+                caller then scrolls once when done)
+        """
+        bulk = cursor is not None
+        if cursor is None:
+            cursor = self.chatHistory.textCursor()
+            cursor.movePosition(QtGui.QTextCursor.End)
+        timestamp = self._format_timestamp(sent_at)
         
         try:
             # Format Morpheus messages (process code blocks)
             if sender == "Morpheus":
-                formatted_message = self.format_morpheus_message(message)
-                # Use Morpheus icon instead of text
-                sender_display = f"{self.morpheus_icon_html} {sender}"
-                # Matrix green color with regular font for better readability
-                text_color = "#00ff41"  # Matrix green
-                text_style = "font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif; color: #00ff41; line-height: 1.4;"
-                html_message = f"""
-                <div class="morpheus-response" style="margin-bottom: 16px; padding: 8px; border-left: 3px solid {color}; background: rgba(255,255,255,0.03);">
-                    <div style="color: {color}; font-weight: 600; margin-bottom: 4px;">
-                        {sender_display} <span style="color: #8b949e; font-size: 11px; font-weight: normal;">{timestamp}</span>
-                    </div>
-                    <div style="{text_style}">
-                        {formatted_message}
-                    </div>
-                </div>
-                <br>
-                """
+                # Use Morpheus icon instead of text; the body is Matrix green
+                html_message = _MORPHEUS_MESSAGE_HTML.format_map({
+                    'color': color,
+                    'sender': f"{self.morpheus_icon_html} {sender}",
+                    'timestamp': timestamp,
+                    'body': self.format_morpheus_message(message),
+                })
                     
             else:
                 # User message - store with ID for editing
-                msg_id = str(uuid.uuid4())[:8]
+                msg_id = str(next(self._user_message_ids))
                 
-                formatted_message = html.escape(message).replace('\n', '<br>')
-                sender_display = sender
-                text_color = "#f0f6fc"
-                text_style = "color: #f0f6fc; line-height: 1.4;"
-                
-                # Make user messages clickable with edit link
-                html_message = f"""
-                <div id="user-msg-{msg_id}" class="user-message user-msg-{msg_id}" style="margin-bottom: 16px; padding: 8px; border-left: 3px solid {color}; background: rgba(255,255,255,0.03);">
-                    <div style="color: {color}; font-weight: 600; margin-bottom: 4px;">
-                        {sender_display} <span style="color: #8b949e; font-size: 11px; font-weight: normal;">{timestamp}</span>
-                        <a href="edit:{msg_id}" style="color: #58a6ff; text-decoration: none; font-size: 11px; margin-left: 8px;">✎ edit</a>
-                    </div>
-                    <div style="{text_style}">
-                        {formatted_message}
-                    </div>
-                </div>
-                <br>
-                """
+                # Only the header (with the edit link) goes through the HTML
+                # parser; the body is inserted as plain text below
+                html_message = _USER_MESSAGE_HEADER_HTML.format_map({
+                    'color': color,
+                    'sender': sender,
+                    'timestamp': timestamp,
+                    'msg_id': msg_id,
+                })
                 
                 # Map msg_id to the conversation index in morpheus_manager.chat_history
                 # This will be the NEXT index when the response is recorded
@@ -629,61 +1024,180 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                         'message': message,
                         'conversation_index': conversation_index
                     }
+                    # Drop the oldest entries once the cap is reached
+                    while len(self._user_messages) > MAX_TRACKED_USER_MESSAGES:
+                        self._user_messages.popitem(last=False)
             
-            cursor = self.chatHistory.textCursor()
-            cursor.movePosition(QtGui.QTextCursor.End)
             cursor.insertHtml(html_message)
             
-            # Scroll to bottom
-            scrollbar = self.chatHistory.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            if sender != "Morpheus":
+                # Plain text needs no escaping and skips QTextDocumentFragment
+                # parsing; line separators keep the body in one bubble block
+                # the way <br> did
+                cursor.mergeBlockFormat(self._user_bubble_block_format)
+                cursor.insertBlock(self._user_body_block_format, self._user_body_char_format)
+                cursor.insertText(message.replace('\n', '\u2028'))
+                cursor.insertBlock(self._message_end_block_format, QtGui.QTextCharFormat())
+            
+            # Scroll to bottom (once per event loop pass)
+            if not bulk:
+                self._schedule_scroll()
             
         except Exception as e:
             # Fallback
             simple_message = f"\n{sender} [{timestamp}]: {message}\n"
-            cursor = self.chatHistory.textCursor()
             cursor.movePosition(QtGui.QTextCursor.End)
             cursor.insertText(simple_message)
             print(f"Chat formatting error: {e}")
     
+    def _format_timestamp(self, sent_at=None):
+        """Format an epoch time as hh:mm, reusing the string within the current minute"""
+        if sent_at is not None:
+            return time.strftime("%H:%M", time.localtime(sent_at))
+        
+        minute = int(time.time() // 60)
+        if minute != self._timestamp_minute:
+            self._timestamp_minute = minute
+            self._timestamp_text = time.strftime("%H:%M", time.localtime(minute * 60))
+        return self._timestamp_text
+    
+    def begin_streaming_message(self, sender, color="#238636"):
+        """Start a streamed message and return a cursor for appending chunks
+        
+        Chunks are inserted as plain text into a single block; the message is
+        only formatted as HTML once, in finalize_streaming_message().
+        """
+        timestamp = self._format_timestamp()
+        sender_display = f"{self.morpheus_icon_html} {sender}" if sender == "Morpheus" else sender
+        
+        cursor = self.chatHistory.textCursor()
+        cursor.movePosition(QtGui.QTextCursor.End)
+        self._stream_start = QtGui.QTextCursor(cursor)
+        self._stream_start.setKeepPositionOnInsert(True)
+        self._stream_sender = sender
+        self._stream_color = color
+        
+        cursor.insertHtml(f"""
+                <div style="color: {color}; font-weight: 600; margin-bottom: 4px;">
+                    {sender_display} <span style="color: #8b949e; font-size: 11px; font-weight: normal;">{timestamp}</span>
+                </div>
+                """)
+        cursor.insertBlock()
+        self._schedule_scroll()
+        return cursor
+    
+    def append_stream_chunk(self, cursor, text):
+        """Append a chunk of streamed text (only the trailing block is re-laid out)"""
+        if self._stream_start is None or not text:
+            return
+        cursor.insertText(text)
+        self._schedule_scroll()
+    
+    def finalize_streaming_message(self, cursor, full_text):
+        """Replace the streamed plain text with the fully formatted message"""
+        if self._stream_start is None:
+            self.add_chat_message("Morpheus", full_text, "#238636")
+            return
+        
+        sender, color = self._stream_sender, self._stream_color
+        
+        # Remove the provisional bubble
+        cursor.setPosition(self._stream_start.position())
+        cursor.movePosition(QtGui.QTextCursor.End, QtGui.QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        
+        self._stream_start = None
+        self._stream_sender = None
+        self._stream_color = None
+        
+        self.add_chat_message(sender, full_text, color)
+    
+    def _schedule_scroll(self):
+        """Queue a single scroll-to-bottom for the next event loop pass"""
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QtCore.QTimer.singleShot(0, self._flush_scroll)
+    
+    def _flush_scroll(self):
+        """Scroll chat history to the bottom"""
+        self._scroll_pending = False
+        scrollbar = self.chatHistory.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
     def format_morpheus_message(self, message):
         """Format Morpheus message with code block actions"""
-        # Pattern for code blocks
-        code_block_pattern = r'```(?:python|py)?\s*(.*?)```'
+        # Build the message in one pass: escape the prose between code blocks
+        # and splice the rendered code block HTML in directly
+        segments, tail = _split_morpheus_message(message)
+        parts = []
+        block_ids = []
+        for prose, raw_code in segments:
+            parts.append(prose)
+            if raw_code:
+                # Prose newlines are already converted; convert the code block's
+                parts.append(self._emit_code_html(raw_code, block_ids).replace('\n', '<br>'))
+        parts.append(tail)
+        formatted_message = ''.join(parts)
         
-        # Store placeholders
-        current_placeholders = {}
+        # Show action buttons and notify about code blocks
+        if block_ids:
+            count = len(block_ids)
+            msg = f"Multiple code suggestions available ({count} blocks)" if count > 1 else "Code suggestion available"
+            # Older messages rendered above the chat don't replace the
+            # current suggestion
+            if self._prepending_history:
+                return formatted_message
+            # 🎯 AUTOMATICALLY show inline diff preview for the latest code block
+            # (the last one emitted here is also the newest entry in _code_blocks)
+            self.currentCodeBlockId = block_ids[-1]
+            latest_code = self._code_blocks[self.currentCodeBlockId].raw
+            QtCore.QTimer.singleShot(100, lambda: self._auto_show_inline_diff(latest_code))
         
-        def extract_and_store_code(match):
-            raw_code = match.group(1).strip()
-            if not raw_code:
-                return ""
-            
-            # Generate unique ID
-            block_id = str(uuid.uuid4())[:8]
-            
-            # Store code
-            self._code_blocks[block_id] = raw_code
-            
+        return formatted_message
+    
+    def _trim_code_blocks(self):
+        """Drop the least recently emitted code blocks once the cap is reached"""
+        while len(self._code_blocks) > MAX_CODE_BLOCKS:
+            old_id = next(iter(self._code_blocks))
+            raw = self._code_blocks.pop(old_id).raw
+            # An older batch rendered above the chat may hold its own copy of
+            # code a newer block shares; only drop the mapping this id owns
+            if self._code_block_ids.get(raw) == old_id:
+                del self._code_block_ids[raw]
+    
+    def _emit_code_html(self, raw_code, block_ids):
+        """Store a code block and return its rendered HTML"""
+        # Identical code shares one entry (and one copy of the text); it is
+        # moved to the end so it still counts as the latest block
+        block_id = self._code_block_ids.get(raw_code)
+        if block_id is not None:
+            block = self._code_blocks.pop(block_id)
+        else:
+            block_id = f"b{next(self._code_block_counter):x}"
+            self._code_block_ids[raw_code] = block_id
             # Determine if this is a targeted fix (≤10 lines) or full code
-            line_count = len(raw_code.split('\n'))
-            is_targeted = line_count <= 10
-            
-            # Format code block with indicator
-            escaped_code = html.escape(raw_code)
-            placeholder = f"___CODE_BLOCK_{block_id}___"
-            
-            # Different styling based on code size
-            if is_targeted:
-                code_type = "Targeted Fix"
-                code_type_color = "#238636"  # Green
-                badge_bg = "#1f2d1f"
-            else:
-                code_type = f"Full Code ({line_count} lines)"
-                code_type_color = "#1f6feb"  # Blue
-                badge_bg = "#1a2332"
-            
-            code_html = f'''
+            line_count = raw_code.count('\n') + 1
+            block = CodeBlock(raw_code, line_count, line_count <= 10)
+        self._code_blocks[block_id] = block
+        block_ids.append(block_id)
+        self._trim_code_blocks()
+        line_count = block.lines
+        is_targeted = block.targeted
+        
+        # Format code block with indicator
+        escaped_code = html.escape(raw_code)
+        
+        # Different styling based on code size
+        if is_targeted:
+            code_type = "Targeted Fix"
+            code_type_color = "#238636"  # Green
+            badge_bg = "#1f2d1f"
+        else:
+            code_type = f"Full Code ({line_count} lines)"
+            code_type_color = "#1f6feb"  # Blue
+            badge_bg = "#1a2332"
+        
+        code_html = f'''
 <div style="margin: 8px 0; border: 1px solid #30363d; border-radius: 4px; background-color: #0d1117; font-family: SFMono-Regular,Consolas,Liberation Mono,Menlo,monospace;">
     <div style="display: flex; align-items: center; justify-content: space-between; padding: 4px 12px; background-color: #161b22; border-bottom: 1px solid #30363d;">
         <div style="display: flex; align-items: center; gap: 6px;">
@@ -697,36 +1211,8 @@ DO NOT return all {line_count} lines back - only return the problematic section.
     </div>
 </div>
 '''
-            
-            self._code_block_html[placeholder] = code_html
-            current_placeholders[placeholder] = code_html
-            
-            return placeholder
-        
-        # Replace code blocks with placeholders
-        processed_message = re.sub(code_block_pattern, extract_and_store_code, message, flags=re.DOTALL)
-        
-        # Escape HTML
-        formatted_message = html.escape(processed_message)
-        
-        # Replace placeholders with code blocks
-        for placeholder, code_html in current_placeholders.items():
-            formatted_message = formatted_message.replace(placeholder, code_html)
-        
-        # Convert newlines
-        formatted_message = formatted_message.replace('\n', '<br>')
-        
-        # Show action buttons and notify about code blocks
-        if current_placeholders:
-            count = len(current_placeholders)
-            msg = f"Multiple code suggestions available ({count} blocks)" if count > 1 else "Code suggestion available"
-            # 🎯 AUTOMATICALLY show inline diff preview for the latest code block
-            if self._code_blocks:
-                self.currentCodeBlockId = list(self._code_blocks.keys())[-1]
-                latest_code = self._code_blocks[self.currentCodeBlockId]
-                QtCore.QTimer.singleShot(100, lambda: self._auto_show_inline_diff(latest_code))
         
-        return formatted_message
+        return code_html
     
     def handle_code_action(self, url):
         """Handle code action button clicks and edit message links"""
@@ -741,10 +1227,7 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                     msg_data = self._user_messages[msg_id]
                     original_message = msg_data['message']
                     
-                    print(f"\n=== EDIT CLICKED ===")
-                    print(f"Message ID: {msg_id}")
-                    print(f"Original message: {original_message[:50]}...")
-                    print("====================\n")
+                    logger.debug("Edit clicked: msg_id=%s message=%r", msg_id, original_message[:50])
                     
                     # Remove this conversation and ALL conversations after it (like ChatGPT)
                     self.remove_message_and_response(msg_id)
@@ -758,12 +1241,13 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                 
             action, block_id = url_str.split('_', 1)
             
-            if block_id not in self._code_blocks:
+            block = self._code_blocks.get(block_id)
+            if block is None:
                 QtWidgets.QMessageBox.information(self.parent, "Code Block Not Found", 
                     f"The requested code block '{block_id}' could not be found.")
                 return
                 
-            code = self._code_blocks[block_id]
+            code = block.raw
             
             # Only handle copy action now
             if action == "copy":
@@ -813,6 +1297,8 @@ DO NOT return all {line_count} lines back - only return the problematic section.
     
     def _auto_show_inline_diff(self, code):
         """Automatically show inline diff preview when AI suggests code"""
+        # Any match still running for an earlier suggestion is now stale
+        self._match_generation += 1
         try:
             editor = self.get_active_editor()
             if not editor:
@@ -824,11 +1310,10 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             if not current_code.strip():
                 return
             
-            print(f"\n🔍 _auto_show_inline_diff() called")
-            print(f"   AI suggested code: {code[:100]}...")
+            logger.debug("Auto inline diff for suggested code %r", code[:100])
             
             # 🎯 Get current syntax errors (like GitHub Copilot uses VS Code diagnostics)
-            errors = editor.get_syntax_errors() if hasattr(editor, 'get_syntax_errors') else []
+            errors = editor.cached_syntax_errors() if hasattr(editor, 'cached_syntax_errors') else []
             hint_line = None
             
             if errors:
@@ -836,22 +1321,21 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                 error_line_1based = errors[0].get('line', 1)
                 hint_line = error_line_1based - 1  # Convert to 0-based
                 error_msg = errors[0].get('message', 'Unknown error')
-                print(f"   🎯 Found {len(errors)} error(s)")
-                print(f"   🔴 First error at line {error_line_1based} (1-based) = line {hint_line} (0-based): {error_msg}")
-                print(f"   💡 Will use 0-based line {hint_line} as the target for inline diff")
+                logger.debug("%d syntax error(s); first at line %d: %s",
+                             len(errors), error_line_1based, error_msg)
                 
                 # 🎯 FORCE use the error line - don't do similarity matching!
                 # This is exactly what GitHub Copilot does
-                current_lines = current_code.split('\n')
-                if 0 <= hint_line < len(current_lines):
+                # (read the line from its document block rather than splitting the buffer)
+                if 0 <= hint_line < editor.document().blockCount():
+                    error_line_text = editor.document().findBlockByNumber(hint_line).text()
                     replacement_info = {
                         'start_line': hint_line,
                         'end_line': hint_line + 1,
-                        'old_code': current_lines[hint_line],
+                        'old_code': error_line_text,
                         'match_quality': 1.0  # Forced match
                     }
-                    print(f"   ✅ Using error line {hint_line} (0-based) directly (GitHub Copilot style)")
-                    print(f"   Old code: {current_lines[hint_line][:80]}...")
+                    logger.debug("Using error line %d directly: %r", hint_line, error_line_text[:80])
                     
                     # Show inline diff preview with red/green highlighting
                     editor.show_inline_replacement(replacement_info, code)
@@ -861,24 +1345,49 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                 # Fallback to cursor position
                 cursor = editor.textCursor()
                 hint_line = cursor.blockNumber()  # 0-based
-                print(f"   📍 No errors found, using cursor position at line {hint_line}")
+                logger.debug("No errors found, using cursor line %d", hint_line)
+            
+            # Try to find matching code to replace - in the background, since
+            # difflib matching on a large buffer would stall the event loop
+            self._match_editor = editor
+            self._match_revision = editor.document().revision()
+            threading.Thread(
+                target=self._find_inline_match,
+                args=(self._match_generation, current_code, code, hint_line),
+                daemon=True
+            ).start()
             
-            # Try to find matching code to replace
+        except Exception as e:
+            logger.exception("Auto inline diff error: %s", e)
+    
+    def _find_inline_match(self, generation, current_code, code, hint_line):
+        """Worker thread: match suggested code against the editor snapshot"""
+        try:
             replacement_info = self.find_code_to_replace(current_code, code, hint_line=hint_line)
-            
-            if replacement_info:
-                print(f"   ✅ Found replacement at line {replacement_info.get('start_line')}")
-                print(f"   Old code matched: {replacement_info.get('old_code')[:80]}...")
-                
-                # Show inline diff preview with red/green highlighting
-                editor.show_inline_replacement(replacement_info, code)
-                self.parent.dock_manager.console.append_tagged("MORPHEUS", "[INFO] Inline diff preview shown in editor", "#00ff41")
-            else:
-                print(f"   ❌ No match found for AI code")
-            
         except Exception as e:
-            print(f"Auto inline diff error: {e}")
-            traceback.print_exc()
+            logger.exception("Auto inline diff error: %s", e)
+            replacement_info = None
+        self._match_signals.matchReady.emit(generation, replacement_info, code)
+    
+    def _on_inline_match_ready(self, generation, replacement_info, code):
+        """Show a background match, unless it is stale"""
+        editor = self._match_editor
+        # A newer suggestion was requested, or the editor changed since the snapshot
+        if (generation != self._match_generation or editor is None
+                or editor is not self.get_active_editor()
+                or editor.document().revision() != self._match_revision):
+            return
+        self._match_editor = None
+        
+        if replacement_info:
+            logger.debug("Found replacement at line %s: %r",
+                         replacement_info.get('start_line'), replacement_info.get('old_code')[:80])
+            
+            # Show inline diff preview with red/green highlighting
+            editor.show_inline_replacement(replacement_info, code)
+            self.parent.dock_manager.console.append_tagged("MORPHEUS", "[INFO] Inline diff preview shown in editor", "#00ff41")
+        else:
+            logger.debug("No match found for AI code")
 
     def keep_as_fix(self, code):
         """Show inline replacement preview for code fixes"""
@@ -923,22 +1432,32 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         """
         current_lines = current_code.split('\n')
         suggested_lines = suggested_code.split('\n')
+        suggested_first = suggested_lines[0].strip()
+        
+        # Identical input: the whole buffer is the match, no diffing needed
+        if current_code == suggested_code:
+            return {
+                'start_line': 0,
+                'end_line': len(current_lines),
+                'old_code': current_code,
+                'match_quality': 1.0
+            }
         
         # 🎯 Strategy 0: If hint_line provided, check that line first
         if hint_line is not None and 0 <= hint_line < len(current_lines):
-            print(f"   🎯 Strategy 0: Checking hint line {hint_line}")
+            logger.debug("Strategy 0: checking hint line %d", hint_line)
             hint_line_text = current_lines[hint_line].strip()
-            suggested_line = suggested_lines[0].strip() if len(suggested_lines) > 0 else ""
+            suggested_line = suggested_first
             
-            if len(hint_line_text) >= 5 and len(suggested_line) >= 5:
-                similarity = difflib.SequenceMatcher(None, hint_line_text, suggested_line).ratio()
-                print(f"      Hint line: '{hint_line_text[:60]}...'")
-                print(f"      Suggested: '{suggested_line[:60]}...'")
-                print(f"      Similarity: {similarity:.2f}")
+            if (len(hint_line_text) >= 5 and len(suggested_line) >= 5
+                    and _may_reach(hint_line_text, suggested_line, 0.6)):
+                similarity = _LineMatcher(suggested_line).ratio(hint_line_text, 0.6)
+                logger.debug("Hint line %r vs suggested %r: similarity %.2f",
+                             hint_line_text[:60], suggested_line[:60], similarity)
                 
                 # If somewhat similar (60%+), use the hint line
                 if similarity >= 0.6:
-                    print(f"   ✅ Strategy 0 SUCCESS: Using hint line {hint_line}")
+                    logger.debug("Strategy 0 match: hint line %d", hint_line)
                     return {
                         'start_line': hint_line,
                         'end_line': hint_line + 1,
@@ -946,24 +1465,53 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                         'match_quality': similarity
                     }
         
+        # Single-line scans (Strategy 1 and the fuzzy pass) compare stripped
+        # lines; strip each buffer line once instead of per comparison
+        stripped_lines = [line.strip() for line in current_lines] if len(suggested_lines) <= 3 else None
+        
         # Strategy 1: Smart line matching with context (for single-line fixes)
         if len(suggested_lines) == 1:
             # Single line fix - need to be smart about which occurrence
-            suggested_line = suggested_lines[0].strip()
+            suggested_line = suggested_first
             
             # Skip if suggested line is too short (likely not meaningful)
             if len(suggested_line) < 5:
-                print(f"   ⚠️ Strategy 1 skipped: suggested line too short ({len(suggested_line)} chars)")
+                logger.debug("Strategy 1 skipped: suggested line too short (%d chars)", len(suggested_line))
                 return None
             
             # Look for lines that are SIMILAR but not exact (the fixed version)
             best_match_line = -1
             best_similarity = 0
             
-            print(f"   🔍 Strategy 1: Looking for line similar to: '{suggested_line[:60]}...'")
+            logger.debug("Strategy 1: looking for line similar to %r", suggested_line[:60])
             
-            for i, current_line in enumerate(current_lines):
-                current_stripped = current_line.strip()
+            # One matcher for the whole scan: the index for the suggested line
+            # is built once and only the candidate line changes
+            line_matcher = _LineMatcher(suggested_line)
+            
+            # ratio() <= 2*min(a, b)/(a + b), so only lines within 0.6x-1.67x
+            # the suggested length can reach 0.75. Lines are bucketed by
+            # length//8 and only nearby buckets are scanned; token-compared
+            # long lines are not bounded by character length, so always kept
+            target_len = len(suggested_line)
+            if target_len > LONG_LINE_CHARS:
+                candidates = range(len(current_lines))
+            else:
+                len_buckets = {}
+                for i, current_stripped in enumerate(stripped_lines):
+                    len_buckets.setdefault(len(current_stripped) // 8, []).append(i)
+                low_bucket = (3 * target_len // 5) // 8
+                high_bucket = (5 * target_len // 3) // 8
+                long_bucket = LONG_LINE_CHARS // 8
+                candidates = sorted(
+                    i for bucket, rows in len_buckets.items()
+                    if low_bucket <= bucket <= high_bucket or bucket >= long_bucket
+                    for i in rows
+                )
+            
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for i in candidates:
+                current_stripped = stripped_lines[i]
                 
                 # Skip very short lines (unlikely to be meaningful)
                 if len(current_stripped) < 5:
@@ -974,19 +1522,18 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                     continue
                 
                 # Calculate similarity (looking for "almost the same")
-                similarity = difflib.SequenceMatcher(None, 
-                    current_stripped, 
-                    suggested_line).ratio()
+                similarity = line_matcher.ratio(current_stripped, 0.75)
                 
                 # If very similar (75-95%), this is likely the broken line
                 if 0.75 <= similarity < 1.0 and similarity > best_similarity:
                     best_match_line = i
                     best_similarity = similarity
-                    print(f"      Line {i}: similarity {similarity:.2f} - '{current_stripped[:60]}...'")
+                    if debug:
+                        logger.debug("Line %d: similarity %.2f - %r", i, similarity, current_stripped[:60])
             
             if best_match_line >= 0 and best_similarity >= 0.75:
                 # Found the broken line that needs fixing
-                print(f"   ✅ Strategy 1 match: line {best_match_line}, similarity {best_similarity:.2f}")
+                logger.debug("Strategy 1 match: line %d, similarity %.2f", best_match_line, best_similarity)
                 return {
                     'start_line': best_match_line,
                     'end_line': best_match_line + 1,
@@ -994,14 +1541,14 @@ DO NOT return all {line_count} lines back - only return the problematic section.
                     'match_quality': best_similarity
                 }
             else:
-                print(f"   ❌ Strategy 1 failed: best similarity was {best_similarity:.2f}")
+                logger.debug("Strategy 1 failed: best similarity was %.2f", best_similarity)
         
         # Strategy 2: Try exact substring match (for multi-line targeted fixes)
         suggested_text = suggested_code.strip()
-        if len(suggested_lines) > 1 and suggested_text in current_code:
-            # Find the position of the exact match
-            start_pos = current_code.find(suggested_text)
-            lines_before = current_code[:start_pos].count('\n')
+        start_pos = current_code.find(suggested_text) if len(suggested_lines) > 1 else -1
+        if start_pos >= 0:
+            # Count lines up to the match in place, without slicing the buffer
+            lines_before = current_code.count('\n', 0, start_pos)
             lines_in_match = suggested_text.count('\n') + 1
             
             return {
@@ -1012,10 +1559,16 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             }
         
         # Strategy 3: Use difflib to find similar sections (for modified fixes)
-        matcher = difflib.SequenceMatcher(None, current_lines, suggested_lines)
-        
-        # Find the longest matching block
-        match = matcher.find_longest_match(0, len(current_lines), 0, len(suggested_lines))
+        # Find the longest matching block. If the suggestion is a leading slice
+        # of the buffer, that block at line 0 is already the longest possible
+        # (and the earliest), so skip the search and the matcher setup.
+        # Otherwise the matcher indexes only the (short) suggested lines, and
+        # one scan over the buffer looks each line up in that index
+        if _common_prefix_len(current_lines, suggested_lines) == len(suggested_lines):
+            match = difflib.Match(0, 0, len(suggested_lines))
+        else:
+            matcher = difflib.SequenceMatcher(None, current_lines, suggested_lines)
+            match = matcher.find_longest_match(0, len(current_lines), 0, len(suggested_lines))
         
         # Lower threshold for small fixes (AI now returns only the problem area)
         min_match_size = min(2, len(suggested_lines) - 1)  # At least 2 lines or suggested-1
@@ -1047,9 +1600,11 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             best_match_ratio = 0
             best_match_line = -1
             
-            for i, current_line in enumerate(current_lines):
+            line_matcher = _LineMatcher(suggested_first)
+            
+            for i, current_stripped in enumerate(stripped_lines):
                 # Compare each line
-                ratio = difflib.SequenceMatcher(None, current_line.strip(), suggested_lines[0].strip()).ratio()
+                ratio = line_matcher.ratio(current_stripped, 0.6)
                 if ratio > best_match_ratio and ratio > 0.6:  # 60% similarity threshold
                     best_match_ratio = ratio
                     best_match_line = i
@@ -1067,8 +1622,6 @@ DO NOT return all {line_count} lines back - only return the problematic section.
     
     def show_replacement_preview(self, editor, replacement_info, new_code):
         """Show VSCode-style diff preview dialog"""
-        from .dialog_styles import apply_dark_theme
-        
         dialog = QtWidgets.QDialog(self.parent)
         dialog.setWindowTitle("Preview Changes")
         dialog.setMinimumSize(800, 600)
@@ -1175,24 +1728,31 @@ DO NOT return all {line_count} lines back - only return the problematic section.
     def apply_replacement(self, editor, replacement_info, new_code):
         """Apply the replacement to the editor"""
         try:
-            current_text = editor.toPlainText()
-            lines = current_text.split('\n')
-            
-            # Replace the section
-            new_lines = (
-                lines[:replacement_info['start_line']] +
-                new_code.split('\n') +
-                lines[replacement_info['end_line']:]
-            )
-            
-            # Apply to editor
-            editor.setPlainText('\n'.join(new_lines))
+            doc = editor.document()
+            start_line = replacement_info['start_line']
+            end_line = min(replacement_info['end_line'], doc.blockCount())
+            
+            # Edit only the affected blocks so the rest of the document is not
+            # re-laid-out and re-highlighted; one edit block keeps a single undo step
+            cursor = QtGui.QTextCursor(doc)
+            cursor.beginEditBlock()
+            if start_line >= doc.blockCount():
+                cursor.movePosition(QtGui.QTextCursor.End)
+                cursor.insertText('\n' + new_code)
+            else:
+                cursor.setPosition(doc.findBlockByNumber(start_line).position())
+                if end_line > start_line:
+                    end_block = doc.findBlockByNumber(end_line - 1)
+                    cursor.setPosition(end_block.position() + end_block.length() - 1,
+                                       QtGui.QTextCursor.KeepAnchor)
+                    cursor.insertText(new_code)
+                else:
+                    cursor.insertText(new_code + '\n')
+            cursor.endEditBlock()
             
             # Move cursor to the replaced section
-            cursor = editor.textCursor()
-            cursor.movePosition(QtGui.QTextCursor.Start)
-            for _ in range(replacement_info['start_line']):
-                cursor.movePosition(QtGui.QTextCursor.Down)
+            start_block = doc.findBlockByNumber(min(start_line, doc.blockCount() - 1))
+            cursor.setPosition(start_block.position())
             editor.setTextCursor(cursor)
             
             self.parent.dock_manager.console.append_tagged(
@@ -1211,14 +1771,26 @@ DO NOT return all {line_count} lines back - only return the problematic section.
     
     def ensure_chat_preserved(self):
         """Ensure chat history is preserved"""
-        if self.chatHistory.toPlainText().strip() == "":
+        if self.chatHistory.document().isEmpty():
             print("Chat was cleared, reloading...")
             self.load_current_conversation()
     
+    def on_morpheus_chunk(self, text):
+        """Show streamed response text as it arrives"""
+        if self._stream_cursor is None:
+            self.hide_thinking_indicator()
+            self._stream_cursor = self.begin_streaming_message("Morpheus", "#238636")
+        self.append_stream_chunk(self._stream_cursor, text)
+    
     def on_morpheus_response(self, response):
         """Handle Morpheus response"""
         self.hide_thinking_indicator()
-        self.add_chat_message("Morpheus", response, "#238636")
+        if self._stream_cursor is not None:
+            # Format the streamed reply once, now that it is complete
+            cursor, self._stream_cursor = self._stream_cursor, None
+            self.finalize_streaming_message(cursor, response)
+        else:
+            self.add_chat_message("Morpheus", response, "#238636")
     
     def show_thinking_indicator(self):
         """Show thinking indicator"""
@@ -1234,8 +1806,7 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         
     def animate_thinking(self):
         """Animate thinking indicator"""
-        dots = "." * (self.thinkingDots % 4)
-        self.responseIndicator.setText(f"Morpheus is pondering{dots}")
+        self.responseIndicator.setText(_THINKING_FRAMES[self.thinkingDots & 3])
         self.thinkingDots += 1
 
     def chat_key_press_event(self, event):
@@ -1278,95 +1849,198 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         self.clear_chat()
         self.update_history_info()
 
+    def _add_chat_resources(self):
+        """Register the images chat messages refer to (clearing the document drops them)"""
+        pixmap = _morpheus_icon_pixmap()
+        if pixmap is not None:
+            self.chatHistory.document().addResource(
+                QtGui.QTextDocument.ImageResource, QtCore.QUrl(_MORPHEUS_ICON_URL), pixmap)
+
     def clear_chat(self):
         """Clear chat display and tracking"""
+        self._stream_start = self._stream_cursor = None
         self.chatHistory.clear()
+        self._add_chat_resources()
         self._user_messages.clear()  # Clear edit tracking when clearing chat
         self._code_blocks.clear()
-        self._code_block_html.clear()
+        self._code_block_ids.clear()
 
     def on_history_updated(self, chat_history):
         """Handle history updates"""
         self.update_history_info()
-        if (self.chatHistory.toPlainText().strip() == "" and 
+        if (self.chatHistory.document().isEmpty() and 
             self.morpheus_manager and self.morpheus_manager.chat_history):
             self.load_current_conversation()
 
-    def load_current_conversation(self):
-        """Load current conversation history"""
+    def load_current_conversation(self, render_from=None):
+        """Load current conversation history
+        
+        Args:
+            render_from: Index of the first history entry to render when showing
+                all conversations; defaults to the last CONVERSATION_RENDER_BATCH
+        """
         if not self.morpheus_manager:
             return
-            
+        
+        self._reloading_chat = True
+        self._rendered_from = 0
+        # No repaints until the whole history is in; the scroll-to-bottom
+        # requested per message is already coalesced into one
+        self.chatHistory.setUpdatesEnabled(False)
+        self._stream_start = self._stream_cursor = None  # a reply still streaming is re-added when complete
         self.chatHistory.clear()
+        self._add_chat_resources()
         
         # Clear code blocks and user messages tracking
         self._code_blocks.clear()
-        self._code_block_html.clear()
+        self._code_block_ids.clear()
         self._user_messages.clear()  # Clear edit message tracking when reloading
         
-        # Load conversation
-        if self.morpheus_manager.current_chat_index >= 0:
-            current_conversation = self.morpheus_manager.get_current_conversation()
-            if current_conversation and isinstance(current_conversation, dict):
-                if 'user' in current_conversation and 'ai' in current_conversation:
-                    self.add_chat_message("You", current_conversation['user'], "#00ff41")
-                    self.add_chat_message("Morpheus", current_conversation['ai'], "#238636")
-        else:
-            # Load all conversations
-            full_history = self.morpheus_manager.chat_history
-            if full_history and isinstance(full_history, list):
-                for entry in full_history:
-                    if isinstance(entry, dict):
-                        if 'user' in entry and 'ai' in entry:
-                            self.add_chat_message("You", entry['user'], "#00ff41")
-                            self.add_chat_message("Morpheus", entry['ai'], "#238636")
-                        elif 'role' in entry and 'content' in entry:
-                            if entry['role'] == 'user':
-                                self.add_chat_message("You", entry['content'], "#00ff41")
-                            else:
-                                self.add_chat_message("Morpheus", entry['content'], "#238636")
+        # Insert every message through one cursor inside a single edit block,
+        # so the document is laid out once instead of after each message
+        cursor = QtGui.QTextCursor(self.chatHistory.document())
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.beginEditBlock()
+        try:
+            # Load conversation
+            if self.morpheus_manager.current_chat_index >= 0:
+                current_conversation = self.morpheus_manager.get_current_conversation()
+                if current_conversation and isinstance(current_conversation, dict):
+                    if 'user' in current_conversation and 'ai' in current_conversation:
+                        sent_at = current_conversation.get('timestamp')
+                        self.add_chat_message("You", current_conversation['user'], "#00ff41", sent_at, cursor)
+                        self.add_chat_message("Morpheus", current_conversation['ai'], "#238636", sent_at, cursor)
+            else:
+                # Load all conversations
+                full_history = self.morpheus_manager.chat_history
+                if full_history and isinstance(full_history, list):
+                    # Older entries are rendered on demand when scrolling up
+                    if render_from is None:
+                        render_from = len(full_history) - CONVERSATION_RENDER_BATCH
+                    self._rendered_from = max(0, render_from)
+                    self._render_history_entries(
+                        itertools.islice(full_history, self._rendered_from, None), cursor)
+        finally:
+            cursor.endEditBlock()
+            self.chatHistory.setUpdatesEnabled(True)
+            self._reloading_chat = False
+        
+        self._schedule_scroll()
         
         self.update_history_info()
+    
+    def _render_history_entries(self, entries, cursor):
+        """Render chat_history entries (both storage formats) at cursor"""
+        for entry in entries:
+            if isinstance(entry, dict):
+                sent_at = entry.get('timestamp')
+                if 'user' in entry and 'ai' in entry:
+                    self.add_chat_message("You", entry['user'], "#00ff41", sent_at, cursor)
+                    self.add_chat_message("Morpheus", entry['ai'], "#238636", sent_at, cursor)
+                elif 'role' in entry and 'content' in entry:
+                    if entry['role'] == 'user':
+                        self.add_chat_message("You", entry['content'], "#00ff41", sent_at, cursor)
+                    else:
+                        self.add_chat_message("Morpheus", entry['content'], "#238636", sent_at, cursor)
+    
+    def _on_chat_scrolled(self, value):
+        """Render the next batch of older conversations when scrolled to the top"""
+        if (value != 0 or self._reloading_chat or self._rendered_from <= 0
+                or not self.morpheus_manager or self.morpheus_manager.current_chat_index != -1):
+            return
+        
+        full_history = self.morpheus_manager.chat_history
+        new_from = max(0, min(self._rendered_from, len(full_history)) - CONVERSATION_RENDER_BATCH)
+        if new_from >= self._rendered_from:
+            return
+        
+        scrollbar = self.chatHistory.verticalScrollBar()
+        old_maximum = scrollbar.maximum()
+        
+        # Insert only the older batch, above what is already rendered, in one
+        # edit block. It goes into a fresh empty first block so the existing
+        # first message keeps its formatting.
+        # The batch's code blocks and user messages are collected separately
+        # and then placed ahead of the newer ones, so both stores stay in
+        # history order and their caps keep dropping the oldest entries.
+        newer_code_blocks, newer_code_block_ids = self._code_blocks, self._code_block_ids
+        newer_user_messages = self._user_messages
+        self._code_blocks, self._code_block_ids = {}, {}
+        self._user_messages = collections.OrderedDict()
+        self._reloading_chat = True
+        self._prepending_history = True
+        cursor = QtGui.QTextCursor(self.chatHistory.document())
+        cursor.beginEditBlock()
+        try:
+            cursor.insertBlock()
+            cursor.movePosition(QtGui.QTextCursor.Start)
+            cursor.setBlockFormat(QtGui.QTextBlockFormat())
+            cursor.setBlockCharFormat(QtGui.QTextCharFormat())
+            self._render_history_entries(
+                itertools.islice(full_history, new_from, self._rendered_from), cursor)
+        finally:
+            cursor.endEditBlock()
+            self._prepending_history = False
+            self._reloading_chat = False
+            self._code_blocks.update(newer_code_blocks)
+            self._code_block_ids.update(newer_code_block_ids)  # newer blocks win for repeated code
+            self._trim_code_blocks()
+            self._user_messages.update(newer_user_messages)
+            while len(self._user_messages) > MAX_TRACKED_USER_MESSAGES:
+                self._user_messages.popitem(last=False)
+        self._rendered_from = new_from
+        
+        # Keep the view on the messages that were at the top
+        scrollbar.setValue(max(1, scrollbar.maximum() - old_maximum))
 
     def update_history_info(self):
         """Update history navigation info"""
         if not self.morpheus_manager:
-            self.historyLabel.setText("1/1")
-            self.prevChatBtn.setEnabled(False)
-            self.nextChatBtn.setEnabled(False)
-            return
-            
-        current, total = self.morpheus_manager.get_conversation_info()
-        
-        if self.morpheus_manager.current_chat_index == -1:
-            label_text = f"All/{total}"
+            state = ("1/1", False, False)
         else:
-            label_text = f"{current}/{total}"
+            current, total = self.morpheus_manager.get_conversation_info()
+            
+            if self.morpheus_manager.current_chat_index == -1:
+                label_text = f"All/{total}"
+            else:
+                label_text = f"{current}/{total}"
+            
+            # Enable/disable buttons
+            prev_enabled = total > 0 and (self.morpheus_manager.current_chat_index == -1 or 
+                                         self.morpheus_manager.current_chat_index > 0)
+            next_enabled = (total > 0 and self.morpheus_manager.current_chat_index != -1 and 
+                           self.morpheus_manager.current_chat_index < total - 1)
+            state = (label_text, prev_enabled, next_enabled)
+        
+        # History updates arrive in bursts; skip the label/button refresh
+        # (and the restyle and repaint it triggers) when nothing changed
+        if state == self._history_state:
+            return
+        self._history_state = state
         
+        label_text, prev_enabled, next_enabled = state
         self.historyLabel.setText(label_text)
-        
-        # Enable/disable buttons
-        prev_enabled = total > 0 and (self.morpheus_manager.current_chat_index == -1 or 
-                                     self.morpheus_manager.current_chat_index > 0)
-        next_enabled = (total > 0 and self.morpheus_manager.current_chat_index != -1 and 
-                       self.morpheus_manager.current_chat_index < total - 1)
-        
         self.prevChatBtn.setEnabled(prev_enabled)
         self.nextChatBtn.setEnabled(next_enabled)
 
     # Provider/Model management
-    def on_provider_changed(self, text):
+    def on_provider_changed(self, index):
         """Handle provider selection change"""
-        provider = "claude" if "Claude" in text else "openai"
+        if index < 0:
+            return
+        provider = PROVIDERS[index][1]
+        
+        settings = self._settings
+        settings.setValue("AI_PROVIDER", provider)
+        self._current_provider = provider
+        
+        self.update_model_list(provider)
         
+        # Morpheus picks the provider up from settings when it is created lazily
         if self.morpheus:
             self.morpheus.provider = provider
             self.morpheus.client = self.morpheus._make_client()
-            
-            settings = QtCore.QSettings("AI_Script_Editor", "settings")
-            settings.setValue("AI_PROVIDER", provider)
-            
-            self.update_model_list()
+            self._client_key = self._make_client_key(provider)
             
             provider_name = "Claude Sonnet" if provider == "claude" else "GPT-4o"
             if self.morpheus.client:
@@ -1374,54 +2048,48 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             else:
                 print(f"⚠ Switched to {provider_name} but no API key found")
 
-    def update_model_list(self):
-        """Update model selector based on current provider"""
+    def update_model_list(self, current_provider=None):
+        """Update model selector based on current provider
+        
+        Args:
+            current_provider: "openai" or "claude"; defaults to the saved provider
+        """
         if not self.model_selector:
             return
         
-        self.model_selector.blockSignals(True)
-        self.model_selector.clear()
-        
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
-        current_provider = settings.value("AI_PROVIDER", "openai")
-        
-        if current_provider == "openai":
-            models = [
-                ("GPT-4o Mini (Fast, Cheap)", "gpt-4o-mini"),
-                ("GPT-4o (Most Capable)", "gpt-4o"),
-                ("GPT-4 Turbo", "gpt-4-turbo"),
-                ("o1-preview (Reasoning)", "o1-preview"),
-                ("o1-mini (Fast Reasoning)", "o1-mini"),
-            ]
-            saved_model = settings.value("OPENAI_MODEL", "gpt-4o-mini")
-        else:
-            models = [
-                ("Claude Sonnet 4 (Latest)", "claude-sonnet-4-20250514"),
-                ("Claude Opus 4 (Most Capable)", "claude-opus-4-20250514"),
-                ("Claude Sonnet 3.5 (Legacy)", "claude-3-5-sonnet-20241022"),
-                ("Claude Haiku 3.5 (Fast)", "claude-3-5-haiku-20241022"),
-            ]
-            saved_model = settings.value("CLAUDE_MODEL", "claude-sonnet-4-20250514")
-        
-        for display_name, model_id in models:
-            self.model_selector.addItem(display_name, model_id)
-        
-        for i in range(self.model_selector.count()):
-            if self.model_selector.itemData(i) == saved_model:
-                self.model_selector.setCurrentIndex(i)
-                break
-        
-        self.model_selector.blockSignals(False)
-        
-        # Reconnect signal
-        if self._model_selector_connected:
-            try:
-                self.model_selector.currentIndexChanged.disconnect(self.on_model_changed)
-            except (RuntimeError, TypeError):
-                pass
+        settings = self._settings
+        if current_provider is None:
+            current_provider = self._current_provider
         
-        self.model_selector.currentIndexChanged.connect(self.on_model_changed)
-        self._model_selector_connected = True
+        # The combo already lists this provider's models
+        if current_provider == self._model_list_provider:
+            return
+        
+        # No currentIndexChanged while refilling; the blocker is released even
+        # if something below raises, so the combo cannot stay muted
+        blocker = QtCore.QSignalBlocker(self.model_selector)
+        try:
+            self.model_selector.clear()
+            
+            if current_provider == "openai":
+                names, model_ids, model_index = _OPENAI_MODEL_NAMES, _OPENAI_MODEL_IDS, _OPENAI_MODEL_INDEX
+                saved_model = settings.value("OPENAI_MODEL", "gpt-4o-mini")
+            else:
+                names, model_ids, model_index = _CLAUDE_MODEL_NAMES, _CLAUDE_MODEL_IDS, _CLAUDE_MODEL_INDEX
+                saved_model = settings.value("CLAUDE_MODEL", "claude-sonnet-4-20250514")
+            
+            # Insert all rows in one call, then attach the model ids
+            self.model_selector.addItems(names)
+            for i, model_id in enumerate(model_ids):
+                self.model_selector.setItemData(i, model_id)
+            
+            # Look the saved model's row up directly rather than scanning itemData()
+            row = model_index.get(saved_model)
+            if row is not None:
+                self.model_selector.setCurrentIndex(row)
+        finally:
+            blocker.unblock()
+        self._model_list_provider = current_provider
 
     def on_model_changed(self, index):
         """Handle model selection change"""
@@ -1429,10 +2097,9 @@ DO NOT return all {line_count} lines back - only return the problematic section.
             return
             
         model_id = self.model_selector.itemData(index)
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
-        current_provider = settings.value("AI_PROVIDER", "openai")
+        settings = self._settings
         
-        if current_provider == "openai":
+        if self._current_provider == "openai":
             settings.setValue("OPENAI_MODEL", model_id)
         else:
             settings.setValue("CLAUDE_MODEL", model_id)
@@ -1443,9 +2110,24 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         print(f"✓ Switched to model: {self.model_selector.currentText()}")
 
     def show_settings_dialog(self):
-        """Show AI provider settings dialog"""
-        from .dialog_styles import apply_dark_theme
+        """Show AI provider settings dialog
+        
+        The dialog is built on first use and kept; each time it is shown its
+        fields are refreshed from the saved settings.
+        """
+        if self._settings_dialog is None:
+            self._settings_dialog = self._build_settings_dialog()
+        dialog, provider_combo, openai_key_input, claude_key_input = self._settings_dialog
+        
+        settings = self._settings
+        provider_combo.setCurrentIndex(1 if self._current_provider == "claude" else 0)
+        openai_key_input.setText(settings.value("OPENAI_API_KEY", ""))
+        claude_key_input.setText(settings.value("ANTHROPIC_API_KEY", ""))
         
+        dialog.open()
+    
+    def _build_settings_dialog(self):
+        """Build the settings dialog; returns (dialog, provider combo, key inputs)"""
         dialog = QtWidgets.QDialog(self.parent)
         dialog.setWindowTitle("AI Provider Settings")
         dialog.setMinimumWidth(500)
@@ -1460,11 +2142,10 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         provider_layout = QtWidgets.QVBoxLayout()
         
         provider_combo = QtWidgets.QComboBox()
-        provider_combo.addItems(["OpenAI (GPT-4o)", "Claude (Anthropic)"])
+        provider_combo.addItem("OpenAI (GPT-4o)", "openai")
+        provider_combo.addItem("Claude (Anthropic)", "claude")
         
-        settings = QtCore.QSettings("AI_Script_Editor", "settings")
-        current_provider = settings.value("AI_PROVIDER", "openai")
-        provider_combo.setCurrentText("Claude (Anthropic)" if current_provider == "claude" else "OpenAI (GPT-4o)")
+        settings = self._settings
         
         provider_layout.addWidget(QtWidgets.QLabel("Select AI Provider:"))
         provider_layout.addWidget(provider_combo)
@@ -1478,7 +2159,6 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         openai_key_input = QtWidgets.QLineEdit()
         openai_key_input.setEchoMode(QtWidgets.QLineEdit.EchoMode.Password)
         openai_key_input.setPlaceholderText("sk-...")
-        openai_key_input.setText(settings.value("OPENAI_API_KEY", ""))
         
         openai_layout.addRow("API Key:", openai_key_input)
         
@@ -1497,7 +2177,6 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         claude_key_input = QtWidgets.QLineEdit()
         claude_key_input.setEchoMode(QtWidgets.QLineEdit.EchoMode.Password)
         claude_key_input.setPlaceholderText("sk-ant-...")
-        claude_key_input.setText(settings.value("ANTHROPIC_API_KEY", ""))
         
         claude_layout.addRow("API Key:", claude_key_input)
         
@@ -1521,20 +2200,36 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         layout.addLayout(button_layout)
         
         def save_settings():
-            provider = "claude" if "Claude" in provider_combo.currentText() else "openai"
-            settings.setValue("AI_PROVIDER", provider)
-            
-            if openai_key_input.text():
-                settings.setValue("OPENAI_API_KEY", openai_key_input.text())
-                os.environ["OPENAI_API_KEY"] = openai_key_input.text()
+            provider = provider_combo.currentData()
+            if provider != self._current_provider:
+                settings.setValue("AI_PROVIDER", provider)
+            self._current_provider = provider
+            
+            # Only write keys that actually changed
+            env_updates = {}
+            for key_input, key_name in ((openai_key_input, "OPENAI_API_KEY"),
+                                        (claude_key_input, "ANTHROPIC_API_KEY")):
+                new_key = key_input.text()
+                if not new_key:
+                    continue
+                if settings.value(key_name, "") != new_key:
+                    settings.setValue(key_name, new_key)
+                if os.environ.get(key_name) != new_key:
+                    env_updates[key_name] = new_key
+            if env_updates:
+                os.environ.update(env_updates)
             
-            if claude_key_input.text():
-                settings.setValue("ANTHROPIC_API_KEY", claude_key_input.text())
-                os.environ["ANTHROPIC_API_KEY"] = claude_key_input.text()
+            # Write all changed values to disk in one go
+            settings.sync()
             
             if self.morpheus:
-                self.morpheus.provider = provider
-                self.morpheus.client = self.morpheus._make_client()
+                # Building a client sets up a new HTTP session; keep the current
+                # one when neither the provider nor its key changed
+                client_key = self._make_client_key(provider)
+                if self.morpheus.client is None or client_key != self._client_key:
+                    self.morpheus.provider = provider
+                    self.morpheus.client = self.morpheus._make_client()
+                    self._client_key = client_key
                 if self.morpheus.client:
                     QtWidgets.QMessageBox.information(dialog, "Success", 
                         f"Successfully connected to {provider.upper()}!")
@@ -1547,72 +2242,52 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         save_btn.clicked.connect(save_settings)
         cancel_btn.clicked.connect(dialog.reject)
         
-        dialog.exec()
+        return dialog, provider_combo, openai_key_input, claude_key_input
     
     def remove_message_and_response(self, msg_id):
         """Remove a conversation and ALL conversations after it (like ChatGPT edit)"""
         try:
             if msg_id not in self._user_messages:
-                print(f"Message ID {msg_id} not found in storage")
+                logger.debug("Message ID %s not found in storage", msg_id)
                 return
             
             if not self.morpheus_manager:
-                print("No morpheus_manager available")
+                logger.debug("No morpheus_manager available")
                 return
             
             # Get the conversation index
             msg_data = self._user_messages[msg_id]
             conversation_index = msg_data['conversation_index']
             
-            print(f"\n=== REMOVING CONVERSATIONS ===")
-            print(f"Message ID: {msg_id}")
-            print(f"Conversation index: {conversation_index}")
-            print(f"Total conversations before: {len(self.morpheus_manager.chat_history)}")
-            print(f"Removing {len(self.morpheus_manager.chat_history) - conversation_index} conversations")
+            logger.debug("Removing conversations: msg_id=%s index=%d total=%d",
+                         msg_id, conversation_index, len(self.morpheus_manager.chat_history))
             
             # Remove from morpheus_manager.chat_history (this is the persistent storage)
             self.morpheus_manager.chat_history = self.morpheus_manager.chat_history[:conversation_index]
             
-            # Also update the persistent memory
+            # Also update the persistent memory (a separate list: record_conversation
+            # appends to both). The disk write is debounced, so quick successive
+            # edits are written once
             if hasattr(self.morpheus_manager, 'memory') and 'conversations' in self.morpheus_manager.memory:
                 self.morpheus_manager.memory['conversations'] = self.morpheus_manager.chat_history.copy()
-                self.morpheus_manager._save_memory()
+                self.morpheus_manager.schedule_save_memory()
             
-            # Clear user messages mapping for removed conversations
-            self._user_messages = {
-                mid: data for mid, data in self._user_messages.items()
-                if data['conversation_index'] < conversation_index
-            }
-            
-            # Reload the chat display
+            # Reload the chat display (this also rebuilds the user messages
+            # mapping from the truncated history, so it needs no filtering here)
             self.load_current_conversation()
             
-            print(f"Total conversations after: {len(self.morpheus_manager.chat_history)}")
-            print("==============================\n")
+            logger.debug("Conversations left: %d", len(self.morpheus_manager.chat_history))
             
         except Exception as e:
-            print(f"Error removing conversations: {e}")
-            import traceback
-            traceback.print_exc()
-            print(f"Error removing messages: {e}")
-            import traceback
-            traceback.print_exc()
-            print(f"Error removing message: {e}")
-            import traceback
-            traceback.print_exc()
-            print(f"Error removing message: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error removing conversations: %s", e)
     
     def show_edit_message_dialog(self, original_message):
         """Show dialog to edit and resend a message"""
-        from .dialog_styles import apply_dark_theme
-        
         dialog = QtWidgets.QDialog(self.parent)
         dialog.setWindowTitle("Edit Message")
         dialog.setMinimumSize(500, 300)
         
-        apply_dark_theme(dialog)
+        apply_dark_theme(dialog, EDIT_MESSAGE_DIALOG_STYLE)
         
         layout = QtWidgets.QVBoxLayout(dialog)
         layout.setSpacing(12)
@@ -1626,21 +2301,7 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         # Text edit with original message
         text_edit = QtWidgets.QPlainTextEdit()
         text_edit.setPlainText(original_message)
-        text_edit.setStyleSheet("""
-            QPlainTextEdit {
-                background: #0d1117;
-                border: 1px solid #30363d;
-                border-radius: 6px;
-                padding: 8px;
-                color: #c9d1d9;
-                font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif;
-                font-size: 13px;
-                line-height: 1.5;
-            }
-            QPlainTextEdit:focus {
-                border-color: #58a6ff;
-            }
-        """)
+        text_edit.setObjectName("editMessageInput")
         layout.addWidget(text_edit, 1)
         
         # Buttons
@@ -1648,37 +2309,11 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         button_layout.addStretch()
         
         cancel_btn = QtWidgets.QPushButton("Cancel")
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background: #21262d;
-                border: 1px solid #30363d;
-                color: #c9d1d9;
-                padding: 6px 16px;
-                border-radius: 6px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background: #30363d;
-                border-color: #8b949e;
-            }
-        """)
+        cancel_btn.setObjectName("cancelBtn")
         cancel_btn.clicked.connect(dialog.reject)
         
         send_btn = QtWidgets.QPushButton("Send to Morpheus")
-        send_btn.setStyleSheet("""
-            QPushButton {
-                background: #238636;
-                border: 1px solid #2ea043;
-                color: white;
-                padding: 6px 16px;
-                border-radius: 6px;
-                font-size: 13px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background: #2ea043;
-            }
-        """)
+        send_btn.setObjectName("sendBtn")
         
         def send_edited_message():
             edited_text = text_edit.toPlainText().strip()
@@ -1698,7 +2333,8 @@ DO NOT return all {line_count} lines back - only return the problematic section.
         
         # Focus on text edit and select all
         text_edit.setFocus()
-        text_edit.selectAll()
+        if original_message:
+            text_edit.selectAll()
         
         dialog.exec()
     
\ No newline at end of file
@@ -3,16 +3,160 @@ Debug Manager
 Handles debugging functionality with breakpoints (VSCode-style)
 """
 import sys
+import io
+import html
 import traceback
-import os
+import collections
+import dis
+import functools
+import inspect
+import reprlib
 from qt_compat import QtWidgets, QtCore, QtGui
 
+# Filename the editor's code is compiled under (identifies user frames)
+EDITOR_FILENAME = '<editor>'
+
+# Number of compiled editor buffers kept for repeated debug runs
+COMPILE_CACHE_SIZE = 8
+
+# Bounded repr for container values in the variables view: only the first
+# few items are formatted instead of the whole container
+_value_repr = reprlib.Repr()
+_value_repr.maxstring = 100
+_value_repr.maxother = 100
+_value_repr.maxlist = _value_repr.maxtuple = _value_repr.maxset = 6
+_value_repr.maxdict = 6
+
 
 class DebugStopException(Exception):
     """Exception raised to stop debugging execution"""
     pass
 
 
+class _ConsoleStream(io.TextIOBase):
+    """Text stream replacing stdout/stderr that appends each line to the console
+    
+    Output reaches the console while the script runs; an unfinished last line
+    is held back until the next newline, flush() or close(). Lines are
+    HTML-escaped, coloured and sent through the console's HTML path
+    (OutputConsole.append would escape the markup again).
+    """
+    
+    encoding = "utf-8"
+    errors = "strict"
+    
+    def __init__(self, console, color="#ffffff"):
+        super().__init__()
+        self._line_format = f"<span style='color:{color};'>{{}}</span>"
+        # A plain QTextEdit fallback console renders HTML passed to append()
+        self._append_html = getattr(console, '_append_html_threadsafe', console.append)
+        self._partial = ""
+    
+    def writable(self):
+        return True
+    
+    def isatty(self):
+        return False
+    
+    def write(self, text):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if not isinstance(text, str):
+            raise TypeError("write() argument must be str, not %s" % type(text).__name__)
+        if "\n" not in text:
+            self._partial += text
+            return len(text)
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._append(line)
+        return len(text)
+    
+    def flush(self):
+        super().flush()
+        if self._partial:
+            self._append(self._partial)
+            self._partial = ""
+    
+    def _append(self, line):
+        self._append_html(self._line_format.format(html.escape(line, quote=False)))
+
+
+@functools.lru_cache(maxsize=256)
+def _local_names(code):
+    """Variable names of a function's code object, or None for module code
+    
+    A function's locals are fixed at compile time (co_varnames and friends
+    never contain dunder names), so they are read once per code object.
+    """
+    if not code.co_flags & inspect.CO_OPTIMIZED:
+        return None
+    return code.co_varnames + code.co_cellvars + code.co_freevars
+
+
+def _format_value(value):
+    """Short display text (at most 100 characters) for a local variable's value"""
+    try:
+        if isinstance(value, (list, tuple, dict, set, frozenset)):
+            # Only the first few items are formatted
+            return _value_repr.repr(value)[:100]
+        return str(value)[:100]
+    except Exception:
+        return f"<{type(value).__name__}>"
+
+
+class StaticTextDelegate(QtWidgets.QStyledItemDelegate):
+    """Item delegate that draws cell text from cached QStaticText layouts
+    
+    The variables tree repaints the same short strings on every scroll and
+    hover; QStaticText keeps their laid-out glyphs so they are not shaped again.
+    Text too wide for its column is elided with the view's elide mode.
+    """
+    
+    MAX_CACHED = 1024
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._static_texts = {}
+    
+    def paint(self, painter, option, index):
+        """Draw the item background via the style, then the cached text"""
+        opt = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        style = opt.widget.style() if opt.widget else QtWidgets.QApplication.style()
+        text = opt.text
+        # Same inset the style uses for item text
+        margin = style.pixelMetric(QtWidgets.QStyle.PM_FocusFrameHMargin, None, opt.widget) + 1
+        rect = style.subElementRect(QtWidgets.QStyle.SE_ItemViewItemText, opt, opt.widget).adjusted(margin, 0, -margin, 0)
+        opt.text = ""
+        style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+        if not text or rect.width() <= 0:
+            return
+        
+        # Cached per (text, width): the elided text depends on the column width
+        key = (text, rect.width())
+        static_text = self._static_texts.get(key)
+        if static_text is None:
+            if len(self._static_texts) >= self.MAX_CACHED:
+                self._static_texts.clear()
+            static_text = QtGui.QStaticText(
+                opt.fontMetrics.elidedText(text, opt.textElideMode, rect.width()))
+            static_text.setTextFormat(QtCore.Qt.PlainText)
+            static_text.prepare(QtGui.QTransform(), opt.font)
+            self._static_texts[key] = static_text
+        
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setFont(opt.font)
+        if opt.state & QtWidgets.QStyle.State_Selected:
+            painter.setPen(opt.palette.color(QtGui.QPalette.HighlightedText))
+        else:
+            painter.setPen(opt.palette.color(QtGui.QPalette.Text))
+        top = rect.top() + (rect.height() - static_text.size().height()) / 2
+        painter.drawStaticText(QtCore.QPointF(rect.left(), top), static_text)
+        painter.restore()
+
+
 class DebugManager:
     """Manages debugging with breakpoints"""
     
@@ -28,6 +172,22 @@ class DebugManager:
         self.debug_locals = {}
         self.debug_globals = {}
         
+        # Editor being debugged, and whether each code object contains a
+        # breakpoint line (only those are traced line by line)
+        self._debug_editor = None
+        self._breakpoints = frozenset()  # snapshot of the editor's breakpoints
+        self._code_has_breakpoint = {}
+        
+        # Source text -> code object, most recently used last
+        self._compile_cache = collections.OrderedDict()
+        
+        # Breakpoint dialog widgets (see _get_breakpoint_dialog)
+        self._bp_dialog = None
+        self._bp_loop = None
+        self._bp_info_label = None
+        self._var_tree = None
+        self._var_items = {}  # variable name -> its row in the variables tree
+        
     def get_current_editor(self):
         """Get the currently active code editor."""
         current_widget = self.parent.tabWidget.currentWidget()
@@ -35,6 +195,23 @@ class DebugManager:
             return current_widget
         return None
     
+    @staticmethod
+    def _restore_streams(old_stdout, old_stderr):
+        """Put back the original stdout/stderr, then close the console streams
+        
+        The originals go back first so a failing close() can never leave the
+        console streams installed (or close Maya's own streams).
+        """
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = old_stdout
+        sys.stderr = old_stderr
+        try:
+            if isinstance(stdout, _ConsoleStream):
+                stdout.close()
+        finally:
+            if isinstance(stderr, _ConsoleStream):
+                stderr.close()
+    
     def run_with_breakpoints(self):
         """Execute code with breakpoint support."""
         from .dialog_styles import create_message_box
@@ -91,34 +268,28 @@ class DebugManager:
                 pass
             
             # Compile code
-            compiled = compile(code, '<editor>', 'exec')
+            compiled = self._compile(code)
             
             # Redirect stdout/stderr to console if available
             if console:
-                import sys
-                from io import StringIO
                 old_stdout = sys.stdout
                 old_stderr = sys.stderr
-                sys.stdout = StringIO()
-                sys.stderr = StringIO()
+                sys.stdout = _ConsoleStream(console)
+                sys.stderr = _ConsoleStream(console, "#f48771")
             
             # Execute with tracing for breakpoints
-            # Use same namespace for both globals and locals
-            sys.settrace(self._trace_function)
-            exec(compiled, self.debug_globals, self.debug_globals)
-            sys.settrace(None)
-            
-            # Restore and capture output
-            if console:
-                output = sys.stdout.getvalue()
-                errors = sys.stderr.getvalue()
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
-                
-                if output:
-                    console.append(output)
-                if errors:
-                    console.append(f"<span style='color:#f48771'>{errors}</span>")
+            # (locals default to the globals dict, i.e. one module namespace)
+            self._debug_editor = editor
+            self._breakpoints = frozenset(breakpoints)
+            self._code_has_breakpoint = {}
+            try:
+                sys.settrace(self._trace_function)
+                exec(compiled, self.debug_globals)
+            finally:
+                sys.settrace(None)
+                # Restore output exactly once, whichever way the run ended
+                if console:
+                    self._restore_streams(old_stdout, old_stderr)
             
             # Clear debug line
             editor.clear_current_debug_line()
@@ -131,11 +302,6 @@ class DebugManager:
             # User stopped debugging - this is normal, not an error
             sys.settrace(None)
             
-            # Restore stdout/stderr if redirected
-            if console and 'old_stdout' in locals():
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
-            
             editor.clear_current_debug_line()
             
             if console:
@@ -144,11 +310,6 @@ class DebugManager:
         except Exception as e:
             sys.settrace(None)
             
-            # Restore stdout/stderr if redirected
-            if console and 'old_stdout' in locals():
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
-            
             editor.clear_current_debug_line()
             error_msg = f"Error: {str(e)}\n\n{traceback.format_exc()}"
             
@@ -162,38 +323,120 @@ class DebugManager:
             msg_box.exec()
         finally:
             self.is_debugging = False
+            self._debug_editor = None
+            self._breakpoints = frozenset()
+            self._code_has_breakpoint = {}
+    
+    def _compile(self, code):
+        """Compile editor code, reusing the code object for unchanged source."""
+        compiled = self._compile_cache.get(code)
+        if compiled is None:
+            # Not optimized, so asserts and line numbers stay as written
+            compiled = compile(code, EDITOR_FILENAME, 'exec', dont_inherit=True)
+            self._compile_cache[code] = compiled
+            if len(self._compile_cache) > COMPILE_CACHE_SIZE:
+                self._compile_cache.popitem(last=False)
+        else:
+            self._compile_cache.move_to_end(code)
+        return compiled
     
     def _trace_function(self, frame, event, arg):
-        """Trace function for breakpoint handling."""
+        """Global trace function: pick which new frames get line tracing.
+        
+        Only frames of the editor's own code whose code object contains a
+        breakpoint line are traced line by line; everything else (including
+        Maya and library code the script calls) runs without a per-line
+        Python callback.
+        """
+        code = frame.f_code
+        if code.co_filename != EDITOR_FILENAME:
+            return None
+        
         # Check if debugging was stopped
         if not self.is_debugging:
             raise DebugStopException("Debugging stopped by user")
         
-        if event == 'line':
-            editor = self.get_current_editor()
-            if not editor:
-                return None
+        has_breakpoint = self._code_has_breakpoint.get(code)
+        if has_breakpoint is None:
+            breakpoints = self._breakpoints
+            has_breakpoint = any(lineno in breakpoints for _, lineno in dis.findlinestarts(code))
+            self._code_has_breakpoint[code] = has_breakpoint
+        return self._trace_lines if has_breakpoint else None
+    
+    def _trace_lines(self, frame, event, arg):
+        """Local trace function: stop at breakpoint lines."""
+        if event != 'line':
+            return self._trace_lines
+        
+        # Check if this line has a breakpoint
+        lineno = frame.f_lineno
+        if lineno in self._breakpoints:
+            # Highlight the line
+            self._debug_editor.set_current_debug_line(lineno)
             
-            # Get current line number
-            lineno = frame.f_lineno
+            # Show dialog with local variables
+            self._show_breakpoint_dialog(frame, lineno)
             
-            # Check if this line has a breakpoint
-            if lineno in editor.breakpoints:
-                # Highlight the line
-                editor.set_current_debug_line(lineno)
-                
-                # Show dialog with local variables
-                self._show_breakpoint_dialog(frame, lineno)
-        
-        return self._trace_function if self.is_debugging else None
+            # Check if debugging was stopped
+            if not self.is_debugging:
+                raise DebugStopException("Debugging stopped by user")
+        
+        return self._trace_lines
     
     def _show_breakpoint_dialog(self, frame, lineno):
         """Show dialog when breakpoint is hit."""
+        dialog = self._get_breakpoint_dialog()
+        dialog.setWindowTitle(f"Breakpoint Hit - Line {lineno}")
+        self._bp_info_label.setText(f"<b>🔴 Breakpoint at line {lineno}</b>")
+        
+        # Update the local variables view in place: rows whose value text and
+        # type are unchanged since the last hit (common in loops) are left alone
+        var_tree = self._var_tree
+        var_items = self._var_items
+        seen = set()
+        new_items = []
+        f_locals = frame.f_locals
+        names = _local_names(frame.f_code)
+        if names is None:
+            # Module level: the namespace is a plain dict of any names
+            names = [name for name in f_locals if name[:2] != '__']
+        for name in names:
+            try:
+                value = f_locals[name]
+            except KeyError:
+                continue  # not bound yet at this line
+            seen.add(name)
+            value_text = _format_value(value)
+            type_name = type(value).__name__
+            item = var_items.get(name)
+            if item is None:
+                item = QtWidgets.QTreeWidgetItem([name, value_text, type_name])
+                var_items[name] = item
+                new_items.append(item)
+            else:
+                if item.text(1) != value_text:
+                    item.setText(1, value_text)
+                if item.text(2) != type_name:
+                    item.setText(2, type_name)
+        for name in [name for name in var_items if name not in seen]:
+            var_tree.takeTopLevelItem(var_tree.indexOfTopLevelItem(var_items.pop(name)))
+        if new_items:
+            var_tree.addTopLevelItems(new_items)
+        
+        # Show the dialog window-modal and wait here until Continue/Stop
+        # closes it. The script has to stay paused on this (GUI) thread, since
+        # maya.cmds may only be called from the main thread.
+        dialog.open()
+        self._bp_loop.exec()
+    
+    def _get_breakpoint_dialog(self):
+        """Breakpoint dialog, built on the first hit and reused afterwards."""
+        if self._bp_dialog is not None:
+            return self._bp_dialog
+        
         from .dialog_styles import apply_dark_theme
         
         dialog = QtWidgets.QDialog(self.parent)
-        dialog.setWindowTitle(f"Breakpoint Hit - Line {lineno}")
-        dialog.setModal(True)
         dialog.setMinimumWidth(500)
         dialog.setMinimumHeight(400)
         
@@ -203,9 +446,9 @@ class DebugManager:
         layout = QtWidgets.QVBoxLayout(dialog)
         
         # Info label
-        info_label = QtWidgets.QLabel(f"<b>🔴 Breakpoint at line {lineno}</b>")
-        info_label.setStyleSheet("color: #00ff41; font-size: 14px;")
-        layout.addWidget(info_label)
+        self._bp_info_label = QtWidgets.QLabel()
+        self._bp_info_label.setStyleSheet("color: #00ff41; font-size: 14px;")
+        layout.addWidget(self._bp_info_label)
         
         # Variables tree
         var_label = QtWidgets.QLabel("Local Variables:")
@@ -215,18 +458,9 @@ class DebugManager:
         var_tree.setHeaderLabels(["Variable", "Value", "Type"])
         var_tree.setColumnWidth(0, 150)
         var_tree.setColumnWidth(1, 250)
-        
-        # Add local variables
-        for name, value in frame.f_locals.items():
-            if not name.startswith('__'):
-                item = QtWidgets.QTreeWidgetItem([
-                    name,
-                    str(value)[:100],  # Truncate long values
-                    type(value).__name__
-                ])
-                var_tree.addTopLevelItem(item)
-        
+        var_tree.setItemDelegate(StaticTextDelegate(var_tree))
         layout.addWidget(var_tree)
+        self._var_tree = var_tree
         
         # Buttons
         button_layout = QtWidgets.QHBoxLayout()
@@ -243,20 +477,24 @@ class DebugManager:
         
         layout.addLayout(button_layout)
         
-        # Show dialog
-        dialog.exec()
+        # Local event loop that runs while the script is paused
+        self._bp_loop = QtCore.QEventLoop(dialog)
+        dialog.finished.connect(self._bp_loop.quit)
+        
+        self._bp_dialog = dialog
+        return dialog
     
     def _stop_debugging(self, dialog):
         """Stop debugging session."""
         self.is_debugging = False
-        editor = self.get_current_editor()
+        editor = self._debug_editor or self.get_current_editor()
         if editor:
             editor.clear_current_debug_line()
         dialog.reject()
     
     def clear_all_breakpoints(self):
         """Clear all breakpoints from current editor."""
-        from .dialog_styles import create_message_box
+        from .dialog_styles import create_message_box, get_message_pixmap
         
         editor = self.get_current_editor()
         if editor:
@@ -267,10 +505,8 @@ class DebugManager:
             )
             
             # Set custom icon (suggestion.png)
-            assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-            success_icon_path = os.path.join(assets_dir, "suggestion.png")
-            if os.path.exists(success_icon_path):
-                icon_pixmap = QtGui.QPixmap(success_icon_path)
-                msg_box.setIconPixmap(icon_pixmap.scaled(48, 48, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
+            icon_pixmap = get_message_pixmap("suggestion.png")
+            if icon_pixmap is not None:
+                msg_box.setIconPixmap(icon_pixmap)
             
             msg_box.exec()
@@ -5,6 +5,13 @@ Centralized styling for all dialogs to maintain consistent theme
 import os
 from qt_compat import QtGui
 
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+_MATRIX_ICON_PATH = os.path.join(_ASSETS_DIR, "matrix.png")
+
+# Decoded images, loaded on first use (see get_app_icon / get_message_pixmap)
+_app_icon = None
+_message_pixmaps = {}
+
 # Dark theme matching the AI Provider Settings dialog
 DARK_DIALOG_STYLE = """
     QDialog {
@@ -211,47 +218,66 @@ DARK_DIALOG_STYLE = """
 """
 
 
-def apply_dark_theme(dialog):
+def apply_dark_theme(dialog, extra_style=""):
     """
     Apply consistent dark theme to a dialog and set the Matrix icon
     
     Args:
         dialog: QDialog instance to style
+        extra_style: Optional dialog-specific rules appended to the theme, so
+            the dialog is styled with a single setStyleSheet call
     """
     # Apply stylesheet
-    dialog.setStyleSheet(DARK_DIALOG_STYLE)
+    dialog.setStyleSheet(DARK_DIALOG_STYLE + extra_style)
     
     # Set window icon
-    try:
-        # Get path to matrix.png icon
-        assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-        icon_path = os.path.join(assets_dir, "matrix.png")
-        
-        if os.path.exists(icon_path):
-            icon = QtGui.QIcon(icon_path)
-            dialog.setWindowIcon(icon)
-    except Exception as e:
-        # Silently fail if icon can't be loaded
-        print(f"[Dialog] Could not load icon: {e}")
+    icon = get_app_icon()
+    if not icon.isNull():
+        dialog.setWindowIcon(icon)
 
 
 def get_app_icon():
     """
     Get the application icon for use in message boxes and dialogs
     
+    The icon is loaded once and shared by every dialog.
+    
     Returns:
         QtGui.QIcon: The Matrix icon, or empty icon if not found
     """
-    try:
-        assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-        icon_path = os.path.join(assets_dir, "matrix.png")
-        
-        if os.path.exists(icon_path):
-            return QtGui.QIcon(icon_path)
-    except Exception as e:
-        print(f"[Dialog] Could not load icon: {e}")
+    global _app_icon
+    if _app_icon is None:
+        _app_icon = QtGui.QIcon()  # Empty icon as fallback
+        try:
+            if os.path.exists(_MATRIX_ICON_PATH):
+                _app_icon = QtGui.QIcon(_MATRIX_ICON_PATH)
+        except Exception as e:
+            print(f"[Dialog] Could not load icon: {e}")
+    
+    return _app_icon
+
+
+def get_message_pixmap(filename):
+    """
+    Get a 48x48 message box icon from the assets folder
+    
+    The image is decoded and scaled once, then reused.
+    
+    Args:
+        filename: Image file name in assets (e.g. "suggestion.png")
     
-    return QtGui.QIcon()  # Return empty icon as fallback
+    Returns:
+        QtGui.QPixmap or None if the file does not exist
+    """
+    if filename not in _message_pixmaps:
+        from qt_compat import QtCore
+        
+        path = os.path.join(_ASSETS_DIR, filename)
+        pixmap = None
+        if os.path.exists(path):
+            pixmap = QtGui.QPixmap(path).scaled(48, 48, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        _message_pixmaps[filename] = pixmap
+    return _message_pixmaps[filename]
 
 
 def create_message_box(parent, title, message, icon_type="information"):
@@ -319,10 +345,9 @@ def show_about_dialog(parent=None):
     iconTitleLayout.setSpacing(10)
     
     # Add Matrix icon to the left
-    icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "matrix.png")
-    if os.path.exists(icon_path):
+    if os.path.exists(_MATRIX_ICON_PATH):
         iconLabel = QtWidgets.QLabel()
-        pixmap = QtGui.QPixmap(icon_path)
+        pixmap = QtGui.QPixmap(_MATRIX_ICON_PATH)
         # Scale the icon smaller (36x36)
         scaled_pixmap = pixmap.scaled(36, 36, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
         iconLabel.setPixmap(scaled_pixmap)
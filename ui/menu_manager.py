@@ -289,7 +289,7 @@ class MenuManager:
     # Tools menu actions
     def _syntax_check(self):
         """Run syntax check on current file"""
-        from .dialog_styles import create_message_box
+        from .dialog_styles import create_message_box, get_message_pixmap
         
         current_widget = self.parent.tabWidget.currentWidget()
         if current_widget:
@@ -300,11 +300,9 @@ class MenuManager:
                 msg_box = create_message_box(self.parent, "Syntax Check", "No syntax errors found!", "information")
                 
                 # Set custom icon (suggestion.png)
-                assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-                success_icon_path = os.path.join(assets_dir, "suggestion.png")
-                if os.path.exists(success_icon_path):
-                    icon_pixmap = QtGui.QPixmap(success_icon_path)
-                    msg_box.setIconPixmap(icon_pixmap.scaled(48, 48, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
+                icon_pixmap = get_message_pixmap("suggestion.png")
+                if icon_pixmap is not None:
+                    msg_box.setIconPixmap(icon_pixmap)
                 
                 msg_box.exec()
             except SyntaxError as e:
@@ -312,11 +310,9 @@ class MenuManager:
                 msg_box = create_message_box(self.parent, "Syntax Error", f"Syntax error at line {e.lineno}: {e.msg}", "warning")
                 
                 # Set custom icon (syntax_error.png)
-                assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-                error_icon_path = os.path.join(assets_dir, "syntax_error.png")
-                if os.path.exists(error_icon_path):
-                    icon_pixmap = QtGui.QPixmap(error_icon_path)
-                    msg_box.setIconPixmap(icon_pixmap.scaled(48, 48, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
+                icon_pixmap = get_message_pixmap("syntax_error.png")
+                if icon_pixmap is not None:
+                    msg_box.setIconPixmap(icon_pixmap)
                 
                 msg_box.exec()
     